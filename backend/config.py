@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -9,7 +9,85 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
-    
+
+    # LLM gateway
+    LLM_PROVIDER: str = "groq"  # groq | openai_compatible | local (see llm_providers.py)
+    GROQ_API_KEY: Optional[str] = None
+    LLM_API_KEY: Optional[str] = None
+    LLM_BASE_URL: Optional[str] = None
+    LLM_LOCAL_BASE_URL: str = "http://127.0.0.1:8900/v1"
+    LLM_DEFAULT_MODEL: str = "llama-3.3-70b-versatile"
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    LLM_MAX_RETRIES: int = 2
+
+    # LLM model routing (see llm_routing.py)
+    LLM_FAST_MODEL: str = "llama-3.1-8b-instant"
+    LLM_VISION_MODEL: str = "meta-llama/llama-4-scout-17b-16e-instruct"
+    LLM_ROUTES: Dict[str, Dict] = {}
+
+    # LLM resilience (see llm_resilience.py)
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    LLM_HEDGING_ENABLED: bool = True
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 4.0
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_cache.db"
+    LLM_CACHE_TTL_SECONDS: float = 86400.0
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+
+    # Stylist semantic answer cache (see semantic_cache.py)
+    STYLIST_SEMANTIC_CACHE_ENABLED: bool = True
+    STYLIST_SEMANTIC_CACHE_THRESHOLD: float = 0.85
+    STYLIST_SEMANTIC_CACHE_MAX_ENTRIES: int = 2000
+    STYLIST_SEMANTIC_CACHE_TTL_SECONDS: float = 86400.0
+    STYLIST_SEMANTIC_CACHE_FEATURES: int = 2048
+
+    # Apify trend scraping
+    APIFY_PLATFORM_TIMEOUT_SECONDS: float = 180.0  # per platform, all shards and dataset reads
+    APIFY_SHARD_TIMEOUT_SECONDS: float = 120.0     # per actor run (one shard), dataset read included
+    APIFY_SHARD_SIZE: int = 3                      # hashtags/keywords per actor run
+    APIFY_RESULTS_PER_SHARD: int = 50
+    APIFY_MAX_PARALLEL_SHARDS: int = 4             # per platform
+    APIFY_RESULT_BUDGET: int = 500                 # posts kept per request across all shards
+
+    # Local store of scraped posts (see post_store.py)
+    POST_STORE_PATH: str = "trend_posts.db"
+    POST_STORE_FRESHNESS_SECONDS: float = 3600.0
+
+    # Per-theme daily trend rollups (see trend_history.py)
+    TREND_HISTORY_PATH: str = "trend_history.db"
+
+    # Image downloads for trend colour extraction (see image_fetcher.py)
+    IMAGE_FETCH_CONCURRENCY: int = 16
+    IMAGE_FETCH_PER_HOST: int = 6
+    IMAGE_FETCH_TIMEOUT_SECONDS: float = 10.0      # per image
+    IMAGE_FETCH_BUDGET_SECONDS: float = 20.0       # per analysis, all images
+    IMAGE_FETCH_MAX_BYTES: int = 8_000_000
+    IMAGE_FETCH_MAX_IMAGES: int = 100
+
+    # Pooled trend palette (see palette.py)
+    PALETTE_SIZE: int = 10
+    PALETTE_IMAGE_SIDE: int = 64                   # images are downscaled to side x side before sampling
+    PALETTE_RESERVOIR_PIXELS: int = 50_000
+    PALETTE_MERGE_DELTA_E: float = 10.0            # Lab distance under which two palette colours are one
+    PALETTE_ADAPTIVE_MIN_IMAGES: int = 30          # adaptive sampling kicks in from this many images
+    PALETTE_ADAPTIVE_BATCH: int = 8                # images per engagement-ranked batch
+    PALETTE_ADAPTIVE_TOLERANCE: float = 0.05       # stop once a batch moves the shares by less than this
+    PALETTE_ADAPTIVE_MIN_BATCHES: int = 3
+
+    # Style lexicon for analyze_popular_styles (see style_lexicon.py); empty = built-in
+    STYLE_LEXICON_PATH: str = ""
+
+    # Corpus document frequencies for TF-IDF keywords (see keyword_index.py)
+    KEYWORD_INDEX_PATH: str = "keyword_index.db"
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -0,0 +1,194 @@
+"""
+Precomputed fabric recommendations.
+
+Garment type and season come from a small closed set, so the fabric advice
+for every common garment x season pair is generated offline and shipped as a
+versioned JSON artifact. routers/fabric.py loads it at startup and answers
+from memory; the LLM is only called for free-text preferences or pairs the
+matrix doesn't cover.
+
+Regenerate the artifact after changing the prompt or the garment/season
+lists (bump MATRIX_VERSION when the prompt changes so stale files are
+ignored):
+
+    python fabric_matrix.py --concurrency 8
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+MATRIX_VERSION = 1
+DEFAULT_MATRIX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", f"fabric_matrix_v{MATRIX_VERSION}.json"
+)
+
+GARMENT_TYPES = [
+    "shirt", "t-shirt", "blouse", "kurta", "kurti", "saree", "lehenga",
+    "salwar kameez", "anarkali", "sherwani", "dress", "gown", "skirt",
+    "trousers", "jeans", "shorts", "jacket", "blazer", "suit", "coat",
+]
+
+SEASONS = ["summer", "monsoon", "autumn", "winter", "spring"]
+
+ALIASES = {
+    "tshirt": "t-shirt",
+    "tee": "t-shirt",
+    "top": "blouse",
+    "sari": "saree",
+    "lehnga": "lehenga",
+    "lehenga choli": "lehenga",
+    "salwar": "salwar kameez",
+    "salwar suit": "salwar kameez",
+    "churidar": "salwar kameez",
+    "pant": "trousers",
+    "pants": "trousers",
+    "trouser": "trousers",
+    "short": "shorts",
+    "denim": "jeans",
+    "overcoat": "coat",
+    "fall": "autumn",
+    "rainy": "monsoon",
+    "rainy season": "monsoon",
+    "rain": "monsoon",
+    "spring/summer": "spring",
+}
+
+
+def normalize(value: str) -> str:
+    """Lowercase, trim and map common spellings onto the canonical names"""
+    value = re.sub(r"\s+", " ", (value or "").strip().lower())
+    if value in ALIASES:
+        return ALIASES[value]
+    if value.endswith("s") and value[:-1] in GARMENT_TYPES:
+        return value[:-1]
+    return value
+
+
+def build_fabric_prompt(garment_type: str, season: str, preferences: str = "") -> str:
+    return f"""As a fabric expert, recommend the best fabrics for:
+Garment Type: {garment_type}
+Season: {season}
+Additional Preferences: {preferences}
+
+Provide:
+1. Top 3 fabric recommendations
+2. Pros and cons for each
+3. Care instructions
+4. Price range
+
+Be specific and practical."""
+
+
+class FabricMatrix:
+    """In-memory garment x season lookup loaded from the precomputed artifact"""
+
+    def __init__(self, entries: Dict[str, Dict[str, str]], metadata: Optional[Dict] = None):
+        self.entries = entries
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MATRIX_PATH) -> "FabricMatrix":
+        """Load the artifact, or an empty matrix if it is missing or stale"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️ Fabric matrix not found at {path}; /recommend will use the LLM")
+            return cls({})
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not load fabric matrix: {e}")
+            return cls({})
+
+        if data.get("version") != MATRIX_VERSION:
+            print(f"⚠️ Ignoring fabric matrix version {data.get('version')} (expected {MATRIX_VERSION})")
+            return cls({})
+
+        metadata = {k: v for k, v in data.items() if k != "recommendations"}
+        return cls(data.get("recommendations", {}), metadata)
+
+    def get(self, garment_type: str, season: str) -> Optional[str]:
+        return self.entries.get(normalize(garment_type), {}).get(normalize(season))
+
+    def __len__(self) -> int:
+        return sum(len(seasons) for seasons in self.entries.values())
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.metadata.get("version"),
+            "generated_at": self.metadata.get("generated_at"),
+            "model": self.metadata.get("model"),
+            "cells": len(self),
+            "possible_cells": len(GARMENT_TYPES) * len(SEASONS),
+        }
+
+
+# ======================== PRECOMPUTE JOB ========================
+
+async def build_matrix(concurrency: int = 8) -> Dict:
+    """Ask the LLM once per garment x season pair and collect the answers"""
+    from llm_gateway import chat_completion, gateway
+    from llm_routing import resolve_attempts
+
+    semaphore = asyncio.Semaphore(concurrency)
+    recommendations: Dict[str, Dict[str, str]] = {}
+    failed: List[str] = []
+
+    async def fill(garment_type: str, season: str):
+        async with semaphore:
+            try:
+                text = await chat_completion(
+                    [{"role": "user", "content": build_fabric_prompt(garment_type, season)}],
+                    task="fabric_advice",
+                    temperature=0.6,
+                    max_tokens=800,
+                    call_site="fabric_matrix.build_matrix",
+                )
+            except Exception as e:
+                print(f"❌ {garment_type} / {season}: {e}")
+                failed.append(f"{garment_type}|{season}")
+                return
+        if text:
+            recommendations.setdefault(garment_type, {})[season] = text
+            print(f"✅ {garment_type} / {season}")
+
+    try:
+        await asyncio.gather(*(fill(g, s) for g in GARMENT_TYPES for s in SEASONS))
+    finally:
+        await gateway.aclose()
+
+    return {
+        "version": MATRIX_VERSION,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model": resolve_attempts("fabric_advice", None, None)[0][0],
+        "garment_types": GARMENT_TYPES,
+        "seasons": SEASONS,
+        "failed": failed,
+        "recommendations": recommendations,
+    }
+
+
+def write_matrix(data: Dict, path: str):
+    """Write atomically so a running server never reads a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the garment x season fabric matrix")
+    parser.add_argument("--output", default=DEFAULT_MATRIX_PATH)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    matrix = asyncio.run(build_matrix(args.concurrency))
+    write_matrix(matrix, args.output)
+    cells = sum(len(s) for s in matrix["recommendations"].values())
+    print(f"Wrote {cells} cells ({len(matrix['failed'])} failed) to {args.output}")
@@ -0,0 +1,185 @@
+"""
+Pre-generated reasoning for the fallback fabric catalog.
+
+When SerpAPI returns nothing, /api/fabric-recommender/recommend serves
+FallbackDatabase fabrics. That usually happens exactly when upstreams are
+struggling, so the fallback path must not depend on the LLM either. The
+catalog is static, so reasoning for every catalog fabric across common
+style x season x occasion combinations is generated offline and shipped as a
+compact lookup file: a gzipped JSON string table plus a flat index array.
+The router loads it at startup; unknown styles or occasions fall back to the
+request defaults so a lookup always lands on a pre-generated answer.
+
+Regenerate after changing the catalog, the combination lists or the
+reasoning prompt:
+
+    python fallback_reasoning.py --concurrency 8
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from fabric_matrix import SEASONS, normalize
+
+REASONING_VERSION = 1
+DEFAULT_REASONING_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", f"fallback_reasoning_v{REASONING_VERSION}.json.gz"
+)
+
+STYLES = ["modern", "traditional", "casual", "formal", "minimalist", "bohemian", "vintage"]
+OCCASIONS = ["casual", "office", "formal", "party", "festive", "wedding"]
+
+# Used when a request's style/occasion/season isn't one of the pre-generated values
+DEFAULT_STYLE = "modern"
+DEFAULT_SEASON = "summer"
+DEFAULT_OCCASION = "casual"
+
+
+class FallbackReasoning:
+    """(fabric, style, season, occasion) -> reasoning text"""
+
+    def __init__(self, fabrics: List[str], texts: List[str], index: List[int], metadata: Optional[Dict] = None):
+        self.metadata = metadata or {}
+        self.texts = texts
+        self._fabric_pos = {name: i for i, name in enumerate(fabrics)}
+        self._index = index
+
+    @classmethod
+    def empty(cls) -> "FallbackReasoning":
+        return cls([], [], [])
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_REASONING_PATH) -> "FallbackReasoning":
+        """Load the lookup file, or an empty table if it is missing or stale"""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️ Fallback reasoning not found at {path}; fallback fabrics will use the LLM")
+            return cls.empty()
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not load fallback reasoning: {e}")
+            return cls.empty()
+
+        if (
+            data.get("version") != REASONING_VERSION
+            or data.get("styles") != STYLES
+            or data.get("seasons") != SEASONS
+            or data.get("occasions") != OCCASIONS
+        ):
+            print("⚠️ Ignoring fallback reasoning built for a different version or combination list")
+            return cls.empty()
+
+        metadata = {k: data[k] for k in ("version", "generated_at", "model") if k in data}
+        return cls(data["fabrics"], data["texts"], data["index"], metadata)
+
+    @property
+    def available(self) -> bool:
+        return bool(self._fabric_pos)
+
+    def get(self, fabric_name: str, style: str, season: str, occasion: str) -> Optional[str]:
+        fabric = self._fabric_pos.get(fabric_name)
+        if fabric is None:
+            return None
+
+        style, season, occasion = normalize(style), normalize(season), normalize(occasion)
+        s = STYLES.index(style) if style in STYLES else STYLES.index(DEFAULT_STYLE)
+        se = SEASONS.index(season) if season in SEASONS else SEASONS.index(DEFAULT_SEASON)
+        o = OCCASIONS.index(occasion) if occasion in OCCASIONS else OCCASIONS.index(DEFAULT_OCCASION)
+
+        position = ((fabric * len(STYLES) + s) * len(SEASONS) + se) * len(OCCASIONS) + o
+        text_id = self._index[position]
+        return self.texts[text_id] if text_id >= 0 else None
+
+    def stats(self) -> Dict:
+        return {
+            **self.metadata,
+            "fabrics": len(self._fabric_pos),
+            "entries": sum(1 for i in self._index if i >= 0),
+            "unique_texts": len(self.texts),
+        }
+
+
+# ======================== BUILD STEP ========================
+
+async def build_reasoning(concurrency: int = 8) -> Dict:
+    """One batched reasoning call per style x season x occasion over the whole catalog"""
+    from llm_gateway import gateway
+    from llm_routing import resolve_attempts
+    from routers.fabric_recommender import FabricMatcher, FallbackDatabase
+
+    catalog = FallbackDatabase.get_fallback_fabrics(list(FallbackDatabase.DATABASE), 0, float("inf"))
+    fabrics = [f["fabric_name"] for f in catalog]
+    combos = [(s, se, o) for s in STYLES for se in SEASONS for o in OCCASIONS]
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[tuple, List[Optional[str]]] = {}
+
+    async def fill(style: str, season: str, occasion: str):
+        prefs = {"style_preference": style, "season": season, "occasion": occasion}
+        async with semaphore:
+            reasonings = await FabricMatcher.generate_batch_reasoning(catalog, {}, prefs)
+        # Never ship the generic error text as if it were generated advice
+        results[(style, season, occasion)] = [
+            None if text == FabricMatcher.template_reasoning(fabric) else text
+            for fabric, text in zip(catalog, reasonings)
+        ]
+        print(f"✅ {style} / {season} / {occasion}")
+
+    try:
+        await asyncio.gather(*(fill(*combo) for combo in combos))
+    finally:
+        await gateway.aclose()
+
+    texts: List[str] = []
+    text_ids: Dict[str, int] = {}
+    index: List[int] = []
+    for f in range(len(fabrics)):
+        for combo in combos:
+            text = results[combo][f]
+            if text is None:
+                index.append(-1)
+                continue
+            if text not in text_ids:
+                text_ids[text] = len(texts)
+                texts.append(text)
+            index.append(text_ids[text])
+
+    return {
+        "version": REASONING_VERSION,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model": resolve_attempts("fabric_reasoning_batch", None, None)[0][0],
+        "fabrics": fabrics,
+        "styles": STYLES,
+        "seasons": SEASONS,
+        "occasions": OCCASIONS,
+        "texts": texts,
+        "index": index,
+    }
+
+
+def write_reasoning(data: Dict, path: str):
+    """Write atomically so a running server never reads a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-generate reasoning for the fallback fabric catalog")
+    parser.add_argument("--output", default=DEFAULT_REASONING_PATH)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    reasoning = asyncio.run(build_reasoning(args.concurrency))
+    write_reasoning(reasoning, args.output)
+    missing = reasoning["index"].count(-1)
+    print(f"Wrote {len(reasoning['index']) - missing} entries ({missing} missing, "
+          f"{len(reasoning['texts'])} unique texts) to {args.output}")
@@ -0,0 +1,103 @@
+"""
+Async image downloads for trend colour extraction.
+
+All downloads share one pooled httpx client. Concurrency is bounded both
+overall and per host, so a single CDN isn't hammered, and every batch gets
+a total time budget: whatever hasn't arrived when the budget runs out is
+cancelled instead of holding up the analysis. Images are yielded in
+arrival order so decoding can start while the rest are still downloading.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import settings
+
+
+class ImageFetcher:
+    """Shared connection pool plus per-batch concurrency and time limits"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.IMAGE_FETCH_TIMEOUT_SECONDS, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=settings.IMAGE_FETCH_CONCURRENCY,
+                    max_keepalive_connections=settings.IMAGE_FETCH_CONCURRENCY,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        """Image bytes, or None if the request fails or the image is too large"""
+        try:
+            async with self._get_client().stream("GET", url) as response:
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > settings.IMAGE_FETCH_MAX_BYTES:
+                        return None
+                    chunks.append(chunk)
+                return b"".join(chunks)
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            print(f"Image fetch error ({url[:80]}): {e}")
+            return None
+
+    async def fetch(
+        self,
+        urls: Iterable[str],
+        budget_seconds: Optional[float] = None,
+        stats: Optional[Dict] = None,
+    ) -> AsyncIterator[Tuple[str, bytes]]:
+        """Yield (url, content) as downloads complete, within the time budget.
+
+        If a `stats` dict is passed it is filled with requested / fetched /
+        failed / timed_out counts.
+        """
+        urls = list(dict.fromkeys(urls))
+        budget_seconds = budget_seconds or settings.IMAGE_FETCH_BUDGET_SECONDS
+        stats = stats if stats is not None else {}
+        stats.update({"requested": len(urls), "fetched": 0, "failed": 0, "timed_out": 0})
+
+        overall = asyncio.Semaphore(settings.IMAGE_FETCH_CONCURRENCY)
+        per_host = defaultdict(lambda: asyncio.Semaphore(settings.IMAGE_FETCH_PER_HOST))
+
+        async def fetch_one(url: str) -> Tuple[str, Optional[bytes]]:
+            # Take the host slot first so a busy host doesn't tie up overall slots
+            async with per_host[urlsplit(url).netloc]:
+                async with overall:
+                    return url, await self._download(url)
+
+        tasks = [asyncio.create_task(fetch_one(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=budget_seconds):
+                url, content = await next_done
+                if content:
+                    stats["fetched"] += 1
+                    yield url, content
+                else:
+                    stats["failed"] += 1
+        except asyncio.TimeoutError:
+            stats["timed_out"] = sum(1 for task in tasks if not task.done())
+            print(f"⏱️ Image budget of {budget_seconds}s spent; dropping {stats['timed_out']} pending downloads")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+image_fetcher = ImageFetcher()
@@ -0,0 +1,223 @@
+"""
+TF-IDF keyword extraction for scraped trend posts.
+
+Captions are tokenized once with a single compiled pattern that keeps
+hashtags, @mentions and URLs out of the keyword stream (hashtags are
+counted separately) and drops stopwords plus social-media filler. A batch
+of posts becomes one sparse document-term matrix (scipy CSR) with
+sublinear term frequency, weighted by IDF from a corpus table of
+document frequencies over every post seen so far.
+
+The IDF table lives in SQLite and is updated incrementally: only posts
+whose (platform, post_id) hasn't been counted before add to the document
+frequencies, so re-analysing stored posts doesn't skew them. A keyword's
+score is the sum of its L2-normalized TF-IDF weights across the batch.
+
+extract() is blocking (SQLite plus the matrix work); async callers run it
+with asyncio.to_thread. The document frequencies are cached in memory and
+loaded once, so this assumes a single server process: with several
+workers sharing the file, each one's cached IDF misses the posts the
+others counted.
+
+Benchmark: python keyword_index.py --posts 10000
+"""
+
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from config import settings
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own same she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours yourself yourselves
+im ive youre dont cant wont didnt doesnt isnt thats its lets got get gets getting go going
+one two new like love loved loving lovely get see look looks looking make made day days today
+tonight week time thing things way much many really so very still even ever every well back
+follow followers following share link bio shop dm comment comments tag tags post posts repost
+instagram insta ig pinterest pin reel reels photo photos pic pics video swipe click check out
+thank thanks please yes oh omg lol via
+""".split())
+
+# URLs, @mentions and #hashtags match without capturing, so only words are kept;
+# words need a letter first
+TOKEN_PATTERN = re.compile(r"https?://\S+|www\.\S+|[@#]\w+|([^\W\d_][\w']*)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Keyword tokens of a caption; hashtags, mentions and URLs are left out"""
+    keywords = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if word:
+            word = word.strip("'")
+            if word.endswith("'s"):
+                word = word[:-2]
+            if len(word) > 2 and word not in STOPWORDS:
+                keywords.append(word)
+    return keywords
+
+
+class KeywordIndex:
+    """Corpus document frequencies (persisted) plus batch TF-IDF scoring"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._doc_freq: Dict[str, int] = {}
+        self._documents = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS doc_freq (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS seen_posts (
+                    platform TEXT NOT NULL,
+                    post_id TEXT NOT NULL,
+                    PRIMARY KEY (platform, post_id)
+                );
+                """
+            )
+            self._conn.commit()
+            self._doc_freq = dict(self._conn.execute("SELECT term, df FROM doc_freq").fetchall())
+            self._documents = self._conn.execute("SELECT COUNT(*) FROM seen_posts").fetchone()[0]
+        return self._conn
+
+    def _update_corpus(self, posts: List[Dict], doc_terms: List[set]):
+        """Add unseen posts' terms to the document frequencies"""
+        conn = self._connect()
+        keys = [(p.get("platform", ""), str(p.get("post_id") or "")) for p in posts]
+        candidates = {key for key in keys if key[1]}
+        seen = set()
+        for platform in {k[0] for k in candidates}:
+            ids = [k[1] for k in candidates if k[0] == platform]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                seen.update(conn.execute(
+                    f"SELECT platform, post_id FROM seen_posts WHERE platform = ? AND post_id IN ({','.join('?' * len(chunk))})",
+                    (platform, *chunk),
+                ).fetchall())
+
+        delta: Dict[str, int] = {}
+        new_keys = []
+        for key, terms in zip(keys, doc_terms):
+            # Posts without an id can't be deduplicated, so they don't update the corpus
+            if not key[1] or key in seen:
+                continue
+            seen.add(key)
+            new_keys.append(key)
+            for term in terms:
+                delta[term] = delta.get(term, 0) + 1
+        if not new_keys:
+            return
+
+        conn.executemany("INSERT OR IGNORE INTO seen_posts (platform, post_id) VALUES (?, ?)", new_keys)
+        conn.executemany(
+            "INSERT INTO doc_freq (term, df) VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+            list(delta.items()),
+        )
+        conn.commit()
+        for term, count in delta.items():
+            self._doc_freq[term] = self._doc_freq.get(term, 0) + count
+        self._documents += len(new_keys)
+
+    def extract(self, posts: List[Dict], top_n: int = 10) -> List[Dict]:
+        """Top TF-IDF keywords of a batch of posts.
+
+        Each is {"keyword", "count", "score"}, where count is the raw number
+        of occurrences in the batch.
+        """
+        vocabulary: Dict[str, int] = {}
+        indices: List[int] = []
+        indptr = [0]
+        doc_terms: List[set] = []
+        for post in posts:
+            text = post.get("caption", "") or post.get("description", "") or post.get("title", "") or ""
+            words = tokenize(text)
+            indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+            indptr.append(len(indices))
+            doc_terms.append(set(words))
+
+        with self._lock:
+            self._update_corpus(posts, doc_terms)
+            terms = list(vocabulary)
+            # Terms from id-less posts may be new to the corpus; count them once
+            doc_freq = np.array([self._doc_freq.get(t, 0) for t in terms], dtype=np.float64)
+            documents = max(self._documents, len(posts))
+
+        if not terms:
+            return []
+
+        counts = csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices), np.asarray(indptr)),
+            shape=(len(posts), len(terms)),
+        )
+        counts.sum_duplicates()
+        totals = np.asarray(counts.sum(axis=0)).ravel()
+
+        # Sublinear TF x smoothed IDF, rows L2-normalized, summed over posts
+        tfidf = counts.copy()
+        tfidf.data = 1.0 + np.log(tfidf.data)
+        idf = np.log((1.0 + documents) / (1.0 + np.maximum(doc_freq, 1.0))) + 1.0
+        tfidf = tfidf.multiply(idf).tocsr()
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        scores = np.asarray(tfidf.multiply(1.0 / norms[:, None]).sum(axis=0)).ravel()
+
+        top = np.argsort(-scores, kind="stable")[:top_n]
+        return [
+            {"keyword": terms[i], "count": int(totals[i]), "score": round(float(scores[i]), 3)}
+            for i in top
+        ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._connect()
+            return {"documents": self._documents, "terms": len(self._doc_freq)}
+
+
+keyword_index = KeywordIndex(path=settings.KEYWORD_INDEX_PATH)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark TF-IDF keyword extraction")
+    parser.add_argument("--posts", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9))) for _ in range(20000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]    # Zipf-like word frequencies
+    filler = sorted(STOPWORDS)
+    posts = []
+    for i in range(args.posts):
+        words = rng.choices(vocab, weights, k=20) + rng.choices(filler, k=10)
+        tags = [f"#{w}" for w in rng.choices(vocab[:500], k=3)]
+        posts.append({"platform": "instagram", "post_id": str(i), "caption": " ".join(words + tags)})
+
+    index = KeywordIndex(path=tempfile.mktemp(suffix=".db"))
+    for label in ("cold corpus", "warm corpus"):
+        started = time.perf_counter()
+        result = index.extract(posts)
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {args.posts} posts in {elapsed * 1000:.0f} ms; top: "
+              f"{', '.join(k['keyword'] for k in result[:5])}")
@@ -0,0 +1,146 @@
+"""
+Persistent LLM response cache.
+
+Completions are stored in a local SQLite file keyed on
+(model, normalized messages, temperature, max_tokens). Entries expire after
+a TTL and the table is kept under a size cap by evicting the least recently
+used rows, so repeat prompts are answered without spending provider quota.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import settings
+
+
+def normalize_messages(messages: List[Dict]) -> List[Dict]:
+    """Collapse whitespace so cosmetic prompt differences share a cache entry"""
+    normalized = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            content = re.sub(r"\s+", " ", content).strip()
+        normalized.append({"role": message.get("role", "user"), "content": content})
+    return normalized
+
+
+def make_cache_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": normalize_messages(messages),
+            "temperature": round(float(temperature), 3),
+            "max_tokens": int(max_tokens),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, key: str, model: str, response: str):
+        """Store a response and evict least recently used rows over the cap"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+
+            count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+llm_cache = LLMCache(
+    path=settings.LLM_CACHE_PATH,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,442 @@
+"""
+Shared async LLM gateway.
+
+Every router talks to the LLM provider through this module instead of
+building its own blocking client. Each upstream is served by a provider from
+llm_providers.py (selected with settings.LLM_PROVIDER) that owns one pooled
+keep-alive HTTP client, and gets a concurrency limit and a request timeout, so a slow completion
+only occupies its own slot and never stalls the event loop. A circuit breaker
+per upstream fails calls fast while the provider is unhealthy, and routes
+marked for hedging send a second attempt once the first runs past the usual
+tail latency.
+"""
+
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from config import settings
+from llm_cache import llm_cache, make_cache_key
+from llm_providers import PROVIDER_CLASSES, LLMProvider
+from llm_resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, counts_as_failure
+from llm_routing import get_route, resolve_attempts, routing_table
+from llm_telemetry import llm_telemetry
+
+# Per-upstream connection settings
+UPSTREAMS = {
+    "groq": {
+        "provider": "groq",
+        "api_key": settings.GROQ_API_KEY,
+        "base_url": None,
+        "timeout": settings.LLM_TIMEOUT_SECONDS,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+    },
+    "openai_compatible": {
+        "provider": "openai_compatible",
+        "api_key": settings.LLM_API_KEY,
+        "base_url": settings.LLM_BASE_URL,
+        "timeout": settings.LLM_TIMEOUT_SECONDS,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+    },
+    "local": {
+        "provider": "local",
+        "api_key": None,
+        "base_url": settings.LLM_LOCAL_BASE_URL,
+        "timeout": settings.LLM_TIMEOUT_SECONDS,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+    },
+}
+
+DEFAULT_UPSTREAM = settings.LLM_PROVIDER
+
+
+class LLMGateway:
+    """Providers, concurrency limits and breakers, one set per upstream"""
+
+    def __init__(self, upstreams: Dict[str, Dict]):
+        self.upstreams = upstreams
+        self._providers: Dict[str, LLMProvider] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.coalesced = 0
+        self.hedged = 0
+
+    def _get_provider(self, upstream: str) -> LLMProvider:
+        """Create the upstream provider lazily so its client binds to the running loop"""
+        if upstream not in self._providers:
+            config = self.upstreams[upstream]
+            provider_class = PROVIDER_CLASSES[config["provider"]]
+            self._providers[upstream] = provider_class(config["api_key"], config["base_url"], config["timeout"])
+        return self._providers[upstream]
+
+    def _get_semaphore(self, upstream: str) -> asyncio.Semaphore:
+        if upstream not in self._semaphores:
+            self._semaphores[upstream] = asyncio.Semaphore(self.upstreams[upstream]["max_concurrency"])
+        return self._semaphores[upstream]
+
+    def _get_breaker(self, upstream: str) -> CircuitBreaker:
+        if upstream not in self._breakers:
+            self._breakers[upstream] = CircuitBreaker(
+                upstream,
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+            )
+        return self._breakers[upstream]
+
+    def _get_latency(self, upstream: str, model: str) -> LatencyTracker:
+        key = f"{upstream}:{model}"
+        if key not in self._latency:
+            self._latency[key] = LatencyTracker()
+        return self._latency[key]
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        task: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 800,
+        upstream: Optional[str] = None,
+        timeout: Optional[float] = None,
+        bypass_cache: bool = False,
+        call_site: Optional[str] = None,
+        details: Optional[Dict] = None,
+    ) -> str:
+        """Run one chat completion and return the message text.
+
+        The model and latency budget come from the routing table for `task`
+        unless `model` is given; a call that overruns its budget is retried
+        once on the other model tier. Raises CircuitOpenError without calling
+        upstream while the provider's circuit is open. Every attempt is
+        recorded in llm_telemetry under `call_site`. If a `details` dict is
+        passed it is filled with the model that answered and the source.
+        """
+        upstream = upstream or DEFAULT_UPSTREAM
+        attempts = resolve_attempts(task, model, timeout)
+        hedge = bool(task and not model and get_route(task).get("hedge", False))
+
+        for i, (attempt_model, attempt_timeout) in enumerate(attempts):
+            started = time.perf_counter()
+            try:
+                result = await self._chat_once(
+                    messages, attempt_model, temperature, max_tokens, upstream, attempt_timeout, bypass_cache, hedge
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    outcome = "timeout"
+                elif isinstance(e, CircuitOpenError):
+                    outcome = "circuit_open"
+                else:
+                    outcome = "error"
+                llm_telemetry.record(call_site, task, attempt_model, outcome, time.perf_counter() - started)
+                if outcome != "timeout" or i == len(attempts) - 1:
+                    raise
+                print(f"⏱️ LLM task '{task}' exceeded {attempt_timeout}s on {attempt_model}, retrying on {attempts[i + 1][0]}")
+                continue
+
+            # Non-streaming calls have no separate first token, so TTFT is the wall time
+            wall = time.perf_counter() - started
+            llm_telemetry.record(
+                call_site, task, attempt_model, result["source"], wall,
+                ttft_seconds=wall, usage=result["usage"],
+            )
+            if details is not None:
+                details.update({"model": attempt_model, "source": result["source"]})
+            return result["content"]
+
+    async def _chat_once(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        upstream: str,
+        timeout: Optional[float],
+        bypass_cache: bool,
+        hedge: bool = False,
+    ) -> Dict:
+        """One completion on one model.
+
+        Responses are served from and written to the persistent cache unless
+        caching is disabled or the caller passes bypass_cache=True. Concurrent
+        callers with the same prompt share a single upstream request.
+        Returns {"content", "usage", "source"}, where source is ok, cache_hit
+        or coalesced.
+        """
+        key = make_cache_key(model, messages, temperature, max_tokens)
+        use_cache = settings.LLM_CACHE_ENABLED and not bypass_cache
+
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return {"content": cached, "usage": None, "source": "cache_hit"}
+
+        # Single-flight: join an identical request that is already running
+        task = self._inflight.get(key)
+        is_leader = task is None
+        if not is_leader:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(
+                self._complete(messages, model, temperature, max_tokens, upstream, timeout, hedge)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller disconnecting doesn't cancel the shared request
+        result = await asyncio.shield(task)
+
+        if not is_leader:
+            # The tokens are already counted against the leading caller
+            return {"content": result["content"], "usage": None, "source": "coalesced"}
+
+        if use_cache and result["content"]:
+            llm_cache.set(key, model, result["content"])
+
+        return {"content": result["content"], "usage": result["usage"], "source": "ok"}
+
+    async def _complete(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        upstream: str,
+        timeout: Optional[float],
+        hedge: bool = False,
+    ) -> Dict:
+        """Send one request upstream through the circuit breaker"""
+        breaker = self._get_breaker(upstream)
+        breaker.before_call()
+        upstream_timeout = self.upstreams[upstream]["timeout"]
+        timeout = timeout or upstream_timeout
+
+        try:
+            if hedge and settings.LLM_HEDGING_ENABLED:
+                result = await self._hedged_attempt(messages, model, temperature, max_tokens, upstream, timeout)
+            else:
+                result = await self._attempt(messages, model, temperature, max_tokens, upstream, timeout)
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if is_budget_overrun(e, timeout, upstream_timeout):
+                # The task's own latency budget ran out; not a sign the provider is down
+                breaker.release_probe()
+            elif counts_as_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+
+        breaker.record_success()
+        return result
+
+    async def _attempt(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        upstream: str,
+        timeout: float,
+    ) -> Dict:
+        """One provider request, bounded by the upstream's semaphore"""
+        provider = self._get_provider(upstream)
+
+        async with self._get_semaphore(upstream):
+            started = time.perf_counter()
+            result = await asyncio.wait_for(
+                provider.complete(model, messages, temperature, max_tokens),
+                timeout=timeout,
+            )
+            self._get_latency(upstream, model).record(time.perf_counter() - started)
+
+        return result
+
+    async def _hedged_attempt(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        upstream: str,
+        timeout: float,
+    ) -> Dict:
+        """Send a backup request if the first runs past the tail-latency percentile.
+
+        Whichever attempt succeeds first wins and the other is cancelled; both
+        share the original timeout budget.
+        """
+        delay = min(self._get_latency(upstream, model).hedge_delay(), timeout)
+        primary = asyncio.ensure_future(
+            self._attempt(messages, model, temperature, max_tokens, upstream, timeout)
+        )
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done or timeout - delay <= 0:
+                return await primary
+
+            self.hedged += 1
+            backup = asyncio.ensure_future(
+                self._attempt(messages, model, temperature, max_tokens, upstream, timeout - delay)
+            )
+            pending = {primary, backup}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        task: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 800,
+        upstream: Optional[str] = None,
+        timeout: Optional[float] = None,
+        bypass_cache: bool = False,
+        call_site: Optional[str] = None,
+    ) -> AsyncIterator[Dict]:
+        """Stream a chat completion as it is generated.
+
+        Yields {"delta": text} for every content chunk, then one final
+        {"done": True, "usage": {...}, "model": ..., "cached": bool} event.
+        A cache hit is replayed as a single delta. The full text is written
+        to the cache once the stream completes. Streams use the task's
+        primary tier only; the budget bounds the wait for the response to start.
+        """
+        upstream = upstream or DEFAULT_UPSTREAM
+        model, timeout = resolve_attempts(task, model, timeout)[0]
+        key = make_cache_key(model, messages, temperature, max_tokens)
+        use_cache = settings.LLM_CACHE_ENABLED and not bypass_cache
+        started = time.perf_counter()
+
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                wall = time.perf_counter() - started
+                llm_telemetry.record(call_site, task, model, "cache_hit", wall, ttft_seconds=wall)
+                yield {"delta": cached}
+                yield {"done": True, "usage": None, "model": model, "cached": True}
+                return
+
+        provider = self._get_provider(upstream)
+        upstream_timeout = self.upstreams[upstream]["timeout"]
+        timeout = timeout or upstream_timeout
+        breaker = self._get_breaker(upstream)
+        parts = []
+        usage = None
+
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            llm_telemetry.record(call_site, task, model, "circuit_open", time.perf_counter() - started)
+            raise
+
+        async with self._get_semaphore(upstream):
+            chunks = provider.stream(model, messages, temperature, max_tokens).__aiter__()
+            try:
+                # The budget bounds the wait for the first chunk
+                first_chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+            except StopAsyncIteration:
+                first_chunk = None
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                if is_budget_overrun(e, timeout, upstream_timeout):
+                    breaker.release_probe()
+                elif counts_as_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                llm_telemetry.record(call_site, task, model, outcome, time.perf_counter() - started)
+                raise
+            breaker.record_success()
+            ttft = time.perf_counter() - started
+
+            if first_chunk is not None:
+                async for chunk in _prepend(first_chunk, chunks):
+                    if chunk.get("delta"):
+                        parts.append(chunk["delta"])
+                        yield {"delta": chunk["delta"]}
+                    if chunk.get("usage"):
+                        usage = chunk["usage"]
+
+        llm_telemetry.record(
+            call_site, task, model, "ok", time.perf_counter() - started,
+            ttft_seconds=ttft, usage=usage,
+        )
+
+        content = "".join(parts)
+        if use_cache and content:
+            llm_cache.set(key, model, content)
+
+        yield {"done": True, "usage": usage, "model": model, "cached": False}
+
+    def stats(self) -> Dict:
+        return {
+            "provider": DEFAULT_UPSTREAM,
+            "upstreams": list(self.upstreams),
+            "in_flight": len(self._inflight),
+            "coalesced_requests": self.coalesced,
+            "hedged_requests": self.hedged,
+            "circuit_breakers": {name: b.snapshot() for name, b in self._breakers.items()},
+            "routes": routing_table(),
+        }
+
+    async def aclose(self):
+        """Close every pooled client (called on app shutdown)"""
+        for provider in self._providers.values():
+            await provider.aclose()
+        self._providers.clear()
+
+
+def is_budget_overrun(error: Exception, timeout: float, upstream_timeout: float) -> bool:
+    """A timeout under a task budget tighter than the upstream's own timeout.
+
+    The circuit breaker is per upstream, so counting these as failures would
+    let one task with a tight budget open the circuit for every other task.
+    """
+    return isinstance(error, asyncio.TimeoutError) and timeout < upstream_timeout
+
+
+async def _prepend(first: Dict, rest: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+    yield first
+    async for item in rest:
+        yield item
+
+
+gateway = LLMGateway(UPSTREAMS)
+
+
+def _caller_site() -> str:
+    """module.function of the code that called a module-level shortcut"""
+    frame = sys._getframe(2)
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+async def chat_completion(messages: List[Dict], **kwargs) -> str:
+    """Module-level shortcut used by the routers"""
+    kwargs.setdefault("call_site", _caller_site())
+    return await gateway.chat(messages, **kwargs)
+
+
+def stream_chat_completion(messages: List[Dict], **kwargs) -> AsyncIterator[Dict]:
+    """Module-level shortcut for streaming completions"""
+    kwargs.setdefault("call_site", _caller_site())
+    return gateway.stream(messages, **kwargs)
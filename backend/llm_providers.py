@@ -0,0 +1,184 @@
+"""
+Pluggable LLM providers for the gateway.
+
+A provider turns one chat-completion request into text (or a stream of text
+deltas) plus token usage. The active provider is chosen with
+settings.LLM_PROVIDER:
+
+- "groq": the Groq cloud API through the official async SDK
+- "openai_compatible": any server speaking the OpenAI chat-completions
+  protocol at LLM_BASE_URL
+- "local": the bundled stand-in server (llm_standin.py) at LLM_LOCAL_BASE_URL,
+  for load tests and benchmarks without the real provider
+"""
+
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+from groq import AsyncGroq
+
+from config import settings
+
+
+def _pooled_http_client(timeout: float) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+def _usage_dict(usage) -> Optional[Dict]:
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return {k: usage.get(k) for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+class LLMProvider:
+    """Interface every provider implements"""
+
+    name = "base"
+
+    def __init__(self, api_key: Optional[str], base_url: Optional[str], timeout: float):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+
+    async def complete(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Dict:
+        """Return {"content": str, "usage": {...} or None}"""
+        raise NotImplementedError
+
+    def stream(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> AsyncIterator[Dict]:
+        """Yield {"delta": str} chunks, then {"usage": {...}} if the provider reports it"""
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class GroqProvider(LLMProvider):
+    """Groq cloud API via the official async SDK"""
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str], base_url: Optional[str], timeout: float):
+        super().__init__(api_key, base_url, timeout)
+        self.client = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=settings.LLM_MAX_RETRIES,
+            http_client=_pooled_http_client(timeout),
+        )
+
+    async def complete(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Dict:
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return {
+            "content": response.choices[0].message.content or "",
+            "usage": _usage_dict(response.usage),
+        }
+
+    async def stream(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> AsyncIterator[Dict]:
+        response_stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        async for chunk in response_stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield {"delta": delta}
+
+            # Groq reports usage on the last chunk under x_groq
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None:
+                yield {"usage": _usage_dict(usage)}
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Plain HTTP client for any OpenAI-style /chat/completions server"""
+
+    name = "openai_compatible"
+
+    def __init__(self, api_key: Optional[str], base_url: Optional[str], timeout: float):
+        super().__init__(api_key, (base_url or "").rstrip("/"), timeout)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = _pooled_http_client(timeout)
+        self.client.headers.update(headers)
+
+    async def complete(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Dict:
+        response = await self.client.post(
+            f"{self.base_url}/chat/completions",
+            json={"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        )
+        response.raise_for_status()
+        data = response.json()
+        return {
+            "content": data["choices"][0]["message"].get("content") or "",
+            "usage": _usage_dict(data.get("usage")),
+        }
+
+    async def stream(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> AsyncIterator[Dict]:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        async with self.client.stream("POST", f"{self.base_url}/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or []
+                if choices:
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield {"delta": delta}
+
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+                if usage:
+                    yield {"usage": _usage_dict(usage)}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+PROVIDER_CLASSES = {
+    "groq": GroqProvider,
+    "openai_compatible": OpenAICompatibleProvider,
+    "local": OpenAICompatibleProvider,
+}
+
+
+def is_client_error(error: Exception) -> bool:
+    """True for malformed-request errors that say nothing about provider health"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in (400, 404, 413, 422)
+    return getattr(error, "status_code", None) in (400, 404, 413, 422)
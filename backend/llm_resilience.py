@@ -0,0 +1,98 @@
+"""
+Circuit breaker and latency tracking for the LLM gateway.
+
+The breaker opens after a run of consecutive upstream failures and makes
+callers fail fast (into their existing fallback text) until a cooldown has
+passed; one probe request is then let through to test recovery. The latency
+tracker keeps a rolling window of successful call durations so the gateway
+can hedge a request once it has run longer than the usual tail.
+"""
+
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import settings
+from llm_providers import is_client_error
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+def counts_as_failure(error: Exception) -> bool:
+    """Malformed requests say nothing about provider health"""
+    return not is_client_error(error)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a request may go upstream now"""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probe_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"LLM upstream '{self.name}' is unavailable (circuit {state})")
+        if state == "half_open":
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        was_probe = self._probe_in_flight
+        self._probe_in_flight = False
+        if was_probe or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None or was_probe:
+                self.trips += 1
+            self.opened_at = time.time()
+
+    def release_probe(self):
+        """Give back the half-open probe slot when a call is cancelled"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected_calls": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one model"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """How long to wait before sending a hedged duplicate request"""
+        if len(self.samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return float(np.percentile(np.fromiter(self.samples, dtype=float), settings.LLM_HEDGE_PERCENTILE))
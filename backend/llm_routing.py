@@ -0,0 +1,78 @@
+"""
+Task-based model routing for the LLM gateway.
+
+Each call site names its task; the routing table maps the task to a model
+tier ("fast" or "large") and a latency budget. If the budget is exceeded the
+gateway retries once on the other tier. Routes with "hedge" enabled also get
+a backup request when the first one runs past the tail latency. Routes can be overridden without code
+changes through the LLM_ROUTES setting (JSON in the environment or .env), e.g.
+
+    LLM_ROUTES='{"pricing_strategy": {"tier": "fast", "budget_seconds": 6}}'
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+MODEL_TIERS = {
+    "fast": settings.LLM_FAST_MODEL,
+    "large": settings.LLM_DEFAULT_MODEL,
+    "vision": settings.LLM_VISION_MODEL,
+}
+
+DEFAULT_ROUTES = {
+    # Long-form, user-facing answers
+    "stylist_chat": {"tier": "large", "budget_seconds": 20},
+    "pricing_strategy": {"tier": "large", "budget_seconds": 20, "hedge": True},
+    "fabric_advice": {"tier": "large", "budget_seconds": 20, "hedge": True},
+    "trend_forecast": {"tier": "large", "budget_seconds": 30, "hedge": True},
+    "design_summary": {"tier": "large", "budget_seconds": 15},
+    "design_package": {"tier": "large", "budget_seconds": 20},
+    "color_recommendations": {"tier": "large", "budget_seconds": 20},
+    # Short or mechanical jobs
+    "stylist_summary": {"tier": "fast", "budget_seconds": 10},
+    "image_prompt": {"tier": "fast", "budget_seconds": 8},
+    "fabric_reasoning": {"tier": "fast", "budget_seconds": 5},
+    "fabric_reasoning_batch": {"tier": "fast", "budget_seconds": 15},
+    "fabric_summary": {"tier": "fast", "budget_seconds": 8},
+    # Image understanding (no text-only tier to fall back to)
+    "body_analysis": {"tier": "vision", "budget_seconds": 30, "fallback": False},
+}
+
+
+def get_route(task: str) -> Dict:
+    """Default route for the task, with any LLM_ROUTES override applied"""
+    route = {"tier": "large", "budget_seconds": settings.LLM_TIMEOUT_SECONDS, "fallback": True, "hedge": False}
+    route.update(DEFAULT_ROUTES.get(task, {}))
+    route.update(settings.LLM_ROUTES.get(task, {}))
+    return route
+
+
+def resolve_attempts(task: Optional[str], model: Optional[str], timeout: Optional[float]) -> List[Tuple[str, Optional[float]]]:
+    """Ordered (model, timeout) attempts for one call.
+
+    An explicit model is used as-is with no fallback; otherwise the task's
+    tier comes first and the other tier is tried once on timeout.
+    """
+    if model or not task:
+        return [(model or MODEL_TIERS["large"], timeout)]
+
+    route = get_route(task)
+    tier = route["tier"] if route["tier"] in MODEL_TIERS else "large"
+    budget = timeout or route["budget_seconds"]
+    attempts = [(MODEL_TIERS[tier], budget)]
+
+    if route.get("fallback", True) and tier != "vision":
+        other = "large" if tier == "fast" else "fast"
+        attempts.append((MODEL_TIERS[other], budget))
+
+    return attempts
+
+
+def routing_table() -> Dict:
+    """Effective routes, for the status endpoints"""
+    tasks = set(DEFAULT_ROUTES) | set(settings.LLM_ROUTES)
+    return {
+        task: {**get_route(task), "model": MODEL_TIERS.get(get_route(task)["tier"], MODEL_TIERS["large"])}
+        for task in sorted(tasks)
+    }
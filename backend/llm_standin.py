@@ -0,0 +1,320 @@
+"""
+Offline stand-in for the LLM provider.
+
+A small FastAPI app that speaks the OpenAI/Groq chat-completions protocol
+(plain and streaming) and returns deterministic canned answers, so every
+endpoint can be load-tested and benchmarked without the real service.
+Latency, token rate and error injection are configurable, which lets us
+measure our own throughput ceiling separately from the provider's.
+
+Run it and point the backend at it:
+
+    python llm_standin.py --port 8900
+    LLM_PROVIDER=local uvicorn main:app
+
+Behaviour is set through STANDIN_* environment variables or at runtime with
+PUT /admin/config:
+
+    STANDIN_LATENCY           time to first token, one of
+                              fixed:MS | uniform:MIN_MS:MAX_MS |
+                              normal:MEAN_MS:STD_MS | lognormal:MEDIAN_MS:SIGMA
+    STANDIN_TOKENS_PER_SECOND generation speed after the first token (0 = instant)
+    STANDIN_ERROR_RATE        fraction of requests answered with an error
+    STANDIN_ERROR_STATUS      HTTP status used for injected errors
+    STANDIN_SEED              RNG seed for latency and error sampling
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+app = FastAPI(title="VastraVaani LLM Stand-in", version="1.0")
+
+
+class StandinConfig(BaseModel):
+    latency: str = os.getenv("STANDIN_LATENCY", "lognormal:400:0.4")
+    tokens_per_second: float = float(os.getenv("STANDIN_TOKENS_PER_SECOND", "250"))
+    error_rate: float = float(os.getenv("STANDIN_ERROR_RATE", "0"))
+    error_status: int = int(os.getenv("STANDIN_ERROR_STATUS", "503"))
+    seed: int = int(os.getenv("STANDIN_SEED", "42"))
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: List[Dict]
+    temperature: float = 0.7
+    max_tokens: int = 800
+    stream: bool = False
+
+    class Config:
+        extra = "ignore"
+
+
+config = StandinConfig()
+rng = random.Random(config.seed)
+counters = {"requests": 0, "errors_injected": 0, "streams": 0}
+
+
+# ======================== SAMPLING ========================
+
+def sample_latency_seconds() -> float:
+    kind, *params = config.latency.split(":")
+    values = [float(p) for p in params]
+
+    if kind == "fixed":
+        ms = values[0]
+    elif kind == "uniform":
+        ms = rng.uniform(values[0], values[1])
+    elif kind == "normal":
+        ms = max(0.0, rng.gauss(values[0], values[1]))
+    elif kind == "lognormal":
+        ms = values[0] * rng.lognormvariate(0, values[1])
+    else:
+        raise ValueError(f"Unknown latency distribution: {config.latency}")
+
+    return ms / 1000
+
+
+def should_inject_error() -> bool:
+    return config.error_rate > 0 and rng.random() < config.error_rate
+
+
+# ======================== CANNED OUTPUTS ========================
+
+FASHION_SENTENCES = [
+    "Pair a structured linen blazer with wide-leg trousers for an effortless smart-casual look.",
+    "Jewel tones like emerald and sapphire photograph beautifully at evening functions.",
+    "A hand-block printed cotton kurta keeps you cool while staying festive.",
+    "Balance a voluminous silhouette with a fitted layer to keep proportions clean.",
+    "Georgette and chiffon drape softly and suit flowing anarkali and saree styles.",
+    "Earthy neutrals with a single statement accessory read modern and minimal.",
+    "Choose breathable natural fibres for daytime events in warm climates.",
+    "Metallic zari borders add heritage detail without overwhelming the outfit.",
+    "Recommended retail pricing should sit at roughly 2.5x production cost for this segment.",
+    "Oversized tailoring and relaxed fits continue to trend strongly across social platforms.",
+]
+
+
+def prompt_text(messages: List[Dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def prompt_seed(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def canned_color_json(seed: int) -> str:
+    palette = [
+        ("#E8D5FF", "Lavender", "Creativity and elegance"),
+        ("#FFE5D0", "Peach", "Warmth and comfort"),
+        ("#1F4E79", "Indigo", "Trust and depth"),
+        ("#C9A227", "Antique Gold", "Luxury and celebration"),
+        ("#2E8B57", "Sea Green", "Balance and renewal"),
+        ("#8B1E3F", "Maroon", "Tradition and passion"),
+    ]
+    picks = [palette[(seed + i) % len(palette)] for i in range(3)]
+    return json.dumps({
+        "recommendations": [
+            {
+                "hex": hex_code,
+                "name": name,
+                "reason": f"{name} harmonises with the detected palette",
+                "use_case": "Accent panels, borders or dupatta",
+                "psychology": psychology,
+            }
+            for hex_code, name, psychology in picks
+        ],
+        "summary": "A balanced palette pairing the detected tones with complementary accents.",
+    }, indent=2)
+
+
+def canned_body_json(seed: int) -> str:
+    shapes = ["athletic", "hourglass", "rectangle", "pear", "apple"]
+    return json.dumps({
+        "height_estimate": 160 + seed % 25,
+        "weight_estimate": 55 + seed % 20,
+        "shoulder_width": 40 + seed % 6,
+        "chest": 90 + seed % 12,
+        "waist": 70 + seed % 12,
+        "hip": 95 + seed % 12,
+        "arm_length": 60 + seed % 8,
+        "inseam": 75 + seed % 10,
+        "body_shape": shapes[seed % len(shapes)],
+        "skin_tone": "#E5BCA8",
+        "posture": "straight",
+        "confidence_score": 80,
+        "analysis_details": "Stand-in analysis with deterministic measurements",
+    }, indent=2)
+
+
+def canned_fabric_batch_json(text: str) -> str:
+    ids = [int(i) for i in re.findall(r"^(\d+)\. ", text, re.MULTILINE)]
+    return json.dumps([
+        {"id": i, "reasoning": FASHION_SENTENCES[i % len(FASHION_SENTENCES)]}
+        for i in ids
+    ])
+
+
+def canned_design_json(seed: int) -> str:
+    return json.dumps({
+        "summary": canned_text(seed, 160),
+        "image_prompt": canned_text(seed + 3, 120),
+    }, indent=2)
+
+
+def canned_text(seed: int, max_tokens: int) -> str:
+    target_words = max(10, min(int(max_tokens * 0.6), 180))
+    words = []
+    i = 0
+    while len(words) < target_words:
+        words.extend(FASHION_SENTENCES[(seed + i) % len(FASHION_SENTENCES)].split())
+        i += 1
+    return " ".join(words[:target_words])
+
+
+def canned_response(messages: List[Dict], max_tokens: int) -> str:
+    """Deterministic answer shaped like what the calling prompt expects"""
+    text = prompt_text(messages)
+    seed = prompt_seed(text)
+
+    if '"recommendations"' in text and "hex" in text:
+        return canned_color_json(seed)
+    if "body measurements" in text.lower():
+        return canned_body_json(seed)
+    if "Return ONLY a JSON array" in text:
+        return canned_fabric_batch_json(text)
+    if '"image_prompt"' in text:
+        return canned_design_json(seed)
+    return canned_text(seed, max_tokens)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (~0.75 words per token)"""
+    return max(1, int(len(text.split()) / 0.75))
+
+
+# ======================== ENDPOINTS ========================
+
+def completion_payload(req: ChatCompletionRequest, content: str, prompt_tokens: int, completion_tokens: int) -> Dict:
+    return {
+        "id": f"standin-{counters['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": req.model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def chunk_payload(req: ChatCompletionRequest, delta: Dict, finish_reason: Optional[str] = None, usage: Optional[Dict] = None) -> str:
+    chunk = {
+        "id": f"standin-{counters['requests']}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": req.model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    if usage:
+        chunk["usage"] = usage
+        chunk["x_groq"] = {"id": chunk["id"], "usage": usage}
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+async def stream_completion(req: ChatCompletionRequest, content: str, prompt_tokens: int, completion_tokens: int):
+    yield chunk_payload(req, {"role": "assistant", "content": ""})
+
+    words = content.split(" ")
+    # Emit a few tokens per chunk so very high token rates don't turn into busy-looping
+    per_chunk = max(1, int(config.tokens_per_second / 50)) if config.tokens_per_second else len(words)
+    for start in range(0, len(words), per_chunk):
+        piece = " ".join(words[start:start + per_chunk])
+        if start + per_chunk < len(words):
+            piece += " "
+        if config.tokens_per_second:
+            await asyncio.sleep(per_chunk / config.tokens_per_second)
+        yield chunk_payload(req, {"content": piece})
+
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    yield chunk_payload(req, {}, finish_reason="stop", usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(req: ChatCompletionRequest):
+    """OpenAI/Groq-compatible chat completions"""
+    counters["requests"] += 1
+
+    await asyncio.sleep(sample_latency_seconds())
+
+    if should_inject_error():
+        counters["errors_injected"] += 1
+        return JSONResponse(
+            status_code=config.error_status,
+            content={"error": {"message": "Injected stand-in error", "type": "standin_error"}},
+        )
+
+    content = canned_response(req.messages, req.max_tokens)
+    prompt_tokens = count_tokens(prompt_text(req.messages))
+    completion_tokens = count_tokens(content)
+
+    if req.stream:
+        counters["streams"] += 1
+        return StreamingResponse(
+            stream_completion(req, content, prompt_tokens, completion_tokens),
+            media_type="text/event-stream",
+        )
+
+    if config.tokens_per_second:
+        await asyncio.sleep(completion_tokens / config.tokens_per_second)
+
+    return completion_payload(req, content, prompt_tokens, completion_tokens)
+
+
+@app.get("/admin/config")
+async def get_config():
+    return {"config": config.dict(), "counters": counters}
+
+
+@app.put("/admin/config")
+async def update_config(new_config: StandinConfig):
+    """Change latency, token rate or error injection without restarting"""
+    global config, rng
+    config = new_config
+    rng = random.Random(config.seed)
+    return {"success": True, "config": config.dict()}
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the offline LLM stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,199 @@
+"""
+In-process telemetry for LLM calls.
+
+The gateway records every call attempt with its call site (module.function),
+task, model and outcome (ok, cache_hit, coalesced, timeout, circuit_open or
+error). Wall time, time to first token and prompt and
+completion token counts go into fixed-bucket histograms. The registry is
+exported in Prometheus text format on /metrics and summarized per call site
+by GET /api/llm/stats, so we can see which call sites dominate latency and
+token spend.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0]
+TOKEN_BUCKETS = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192]
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def merge(self, other: "Histogram"):
+        self.count += other.count
+        self.sum += other.sum
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-th observation (capped at the largest bucket)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return self.buckets[min(i, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+
+class CallSeries:
+    """All histograms for one (call_site, task, model, outcome) combination"""
+
+    def __init__(self):
+        self.wall_seconds = Histogram(LATENCY_BUCKETS)
+        self.ttft_seconds = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+
+
+SeriesKey = Tuple[str, str, str, str]
+
+
+class LLMTelemetry:
+    def __init__(self):
+        self._series: Dict[SeriesKey, CallSeries] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(
+        self,
+        call_site: str,
+        task: Optional[str],
+        model: str,
+        outcome: str,
+        wall_seconds: float,
+        ttft_seconds: Optional[float] = None,
+        usage: Optional[Dict] = None,
+    ):
+        key = (call_site or "unknown", task or "-", model, outcome)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = CallSeries()
+            series.wall_seconds.observe(wall_seconds)
+            if ttft_seconds is not None:
+                series.ttft_seconds.observe(ttft_seconds)
+            if usage:
+                series.prompt_tokens.observe(usage.get("prompt_tokens") or 0)
+                series.completion_tokens.observe(usage.get("completion_tokens") or 0)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.started_at = time.time()
+
+    # ======================== EXPORT ========================
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition of every histogram"""
+        metrics = [
+            ("llm_call_wall_seconds", "Wall time of LLM calls", "wall_seconds"),
+            ("llm_call_ttft_seconds", "Time to first token of LLM calls", "ttft_seconds"),
+            ("llm_call_prompt_tokens", "Prompt tokens per LLM call", "prompt_tokens"),
+            ("llm_call_completion_tokens", "Completion tokens per LLM call", "completion_tokens"),
+        ]
+        lines = []
+        with self._lock:
+            items = list(self._series.items())
+
+        for name, help_text, attr in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (call_site, task, model, outcome), series in items:
+                hist = getattr(series, attr)
+                if not hist.count:
+                    continue
+                labels = f'call_site="{call_site}",task="{task}",model="{model}",outcome="{outcome}"'
+                running = 0
+                for bound, n in zip(hist.buckets + [None], hist.counts):
+                    running += n
+                    le = "+Inf" if bound is None else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {running}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum:g}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        """Per call-site rollup, heaviest total wall time first"""
+        with self._lock:
+            items = list(self._series.items())
+
+        sites: Dict[str, Dict] = {}
+        for (call_site, task, model, outcome), series in items:
+            site = sites.setdefault(call_site, {
+                "call_site": call_site,
+                "tasks": set(),
+                "models": set(),
+                "outcomes": {},
+                "wall": Histogram(LATENCY_BUCKETS),
+                "ttft": Histogram(LATENCY_BUCKETS),
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            })
+            site["tasks"].add(task)
+            site["models"].add(model)
+            site["outcomes"][outcome] = site["outcomes"].get(outcome, 0) + series.wall_seconds.count
+            site["wall"].merge(series.wall_seconds)
+            site["ttft"].merge(series.ttft_seconds)
+            site["prompt_tokens"] += int(series.prompt_tokens.sum)
+            site["completion_tokens"] += int(series.completion_tokens.sum)
+
+        total_wall = sum(s["wall"].sum for s in sites.values()) or 1.0
+        total_tokens = sum(s["prompt_tokens"] + s["completion_tokens"] for s in sites.values()) or 1
+
+        rows = []
+        for site in sites.values():
+            calls = site["wall"].count
+            errors = sum(site["outcomes"].get(o, 0) for o in ("timeout", "circuit_open", "error"))
+            tokens = site["prompt_tokens"] + site["completion_tokens"]
+            rows.append({
+                "call_site": site["call_site"],
+                "tasks": sorted(site["tasks"]),
+                "models": sorted(site["models"]),
+                "calls": calls,
+                "outcomes": site["outcomes"],
+                "error_rate": round(errors / calls, 3) if calls else 0.0,
+                "wall_seconds_total": round(site["wall"].sum, 3),
+                "wall_seconds_mean": _round(site["wall"].mean()),
+                "wall_seconds_p50": site["wall"].quantile(0.5),
+                "wall_seconds_p95": site["wall"].quantile(0.95),
+                "ttft_seconds_mean": _round(site["ttft"].mean()),
+                "prompt_tokens": site["prompt_tokens"],
+                "completion_tokens": site["completion_tokens"],
+                "share_of_wall_time": round(site["wall"].sum / total_wall, 3),
+                "share_of_tokens": round(tokens / total_tokens, 3),
+            })
+
+        rows.sort(key=lambda r: r["wall_seconds_total"], reverse=True)
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "call_sites": rows,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+llm_telemetry = LLMTelemetry()
@@ -1,9 +1,15 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 from routers.auth_router import router as auth_router
 from database import engine, Base
+from llm_gateway import gateway
+from image_fetcher import image_fetcher
+from config import settings
+from llm_cache import llm_cache
+from llm_telemetry import llm_telemetry
 import os
 
 load_dotenv()
@@ -15,9 +21,11 @@ from routers import (
     advanced_trends, 
     design_generator,
     fabric_recommender,  # NEW IMPORT
+    fabric,
     color_pattern_analyzer,
     ar_tryon_agent ,
-    auth_router # NEW IMPORT
+    auth_router, # NEW IMPORT
+    llm_stats
 )
 Base.metadata.create_all(bind=engine)
 app = FastAPI(title="VastraVaani AI Platform", version="3.0")
@@ -45,6 +53,7 @@ app.include_router(pricing.router, prefix="/api/pricing", tags=["Pricing"])
 app.include_router(bookmarks.router, prefix="/api/bookmarks", tags=["Bookmarks"])
 app.include_router(design_generator.router, prefix="/api/design-generator", tags=["Design Generator"])
 app.include_router(fabric_recommender.router, prefix="/api/fabric-recommender", tags=["Fabric Recommender"])  # NEW ROUTER
+app.include_router(fabric.router, prefix="/api/fabric", tags=["Fabric"])
 app.include_router(
     color_pattern_analyzer.router,
     prefix="/api/color-pattern-analyzer",
@@ -56,6 +65,16 @@ app.include_router(
     tags=["3D AR Try-On Agent"]
 )
 app.include_router(auth_router.router, prefix="/api/auth", tags=["authentication"])
+app.include_router(llm_stats.router, prefix="/api/llm", tags=["LLM Telemetry"])
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    await gateway.aclose()
+
+@app.on_event("shutdown")
+async def close_image_fetcher():
+    await image_fetcher.aclose()
+
 @app.get("/")
 def root():
     return {
@@ -78,7 +97,15 @@ def root():
 def health():
     return {
         "status": "healthy",
+        "llm_provider": settings.LLM_PROVIDER,
         "groq_configured": bool(os.getenv("GROQ_API_KEY")),
         "apify_configured": bool(os.getenv("APIFY_API_KEY")),
-        "huggingface_configured": bool(os.getenv("HUGGINGFACE_API_KEY"))
+        "huggingface_configured": bool(os.getenv("HUGGINGFACE_API_KEY")),
+        "llm_gateway": gateway.stats(),
+        "llm_cache": llm_cache.stats()
     }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """LLM call histograms in Prometheus text format"""
+    return llm_telemetry.prometheus_text()
@@ -0,0 +1,186 @@
+"""
+Global colour palette for a set of trend images.
+
+Instead of clustering every image on its own and merging the results by
+exact hex string, pixels from all images are pooled and clustered once:
+
+- each image is downscaled and converted to CIE Lab, where Euclidean
+  distance roughly matches perceived colour difference, so near-identical
+  shades end up in the same cluster
+- pixels go into a fixed-size weighted reservoir (Efraimidis-Spirakis
+  keys), so memory stays bounded however many images arrive and an
+  image's weight (e.g. post engagement) sets its share of the sample
+- one mini-batch k-means run over the reservoir gives the palette;
+  centers closer than PALETTE_MERGE_DELTA_E are merged, and each colour's
+  share is the fraction of sampled pixels closest to it
+
+palette_shift() compares two palettes so callers can stop sampling once
+the shares have settled.
+"""
+
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config import settings
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """(n, 3) uint8 RGB -> (n, 3) float32 Lab (L 0-100, a/b roughly -128..127)"""
+    scaled = (np.asarray(rgb, dtype=np.float32) / 255.0).reshape(1, -1, 3)
+    return cv2.cvtColor(scaled, cv2.COLOR_RGB2LAB).reshape(-1, 3)
+
+
+def lab_to_rgb(lab: np.ndarray) -> np.ndarray:
+    """(n, 3) float Lab -> (n, 3) uint8 RGB"""
+    rgb = cv2.cvtColor(np.asarray(lab, dtype=np.float32).reshape(1, -1, 3), cv2.COLOR_LAB2RGB)
+    return np.clip(np.rint(rgb.reshape(-1, 3) * 255.0), 0, 255).astype(np.uint8)
+
+
+def image_lab_pixels(content: bytes, side: Optional[int] = None) -> Optional[np.ndarray]:
+    """Decode an encoded image and return its downscaled pixels in Lab, or None"""
+    img = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+    side = side or settings.PALETTE_IMAGE_SIDE
+    img = cv2.resize(img, (side, side), interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return rgb_to_lab(rgb.reshape(-1, 3))
+
+
+class PixelReservoir:
+    """Fixed-size weighted sample of pixels across many images"""
+
+    def __init__(self, capacity: Optional[int] = None, seed: int = 0):
+        self.capacity = capacity or settings.PALETTE_RESERVOIR_PIXELS
+        self._rng = np.random.default_rng(seed)
+        self.pixels = np.empty((0, 3), dtype=np.float32)
+        self._keys = np.empty(0)
+        self.images = 0
+        self.seen_pixels = 0
+
+    def add(self, pixels: np.ndarray, weight: float = 1.0):
+        """Offer an image's pixels; `weight` scales how strongly it is represented"""
+        if pixels is None or not len(pixels) or weight <= 0:
+            return
+        # Efraimidis-Spirakis: keep the largest u ** (1 / w), compared as log(u) / w
+        keys = np.log(self._rng.random(len(pixels))) / weight
+        self.images += 1
+        self.seen_pixels += len(pixels)
+
+        pixels = np.concatenate([self.pixels, pixels])
+        keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.capacity:
+            keep = np.argpartition(keys, -self.capacity)[-self.capacity:]
+            pixels, keys = pixels[keep], keys[keep]
+        self.pixels, self._keys = pixels, keys
+
+
+def minibatch_kmeans(
+    points: np.ndarray,
+    k: int,
+    batch_size: int = 1024,
+    iterations: int = 60,
+    seed: int = 0,
+) -> np.ndarray:
+    """Mini-batch k-means (Sculley 2010) with k-means++ seeding; returns (k, dims) centers"""
+    rng = np.random.default_rng(seed)
+    points = np.asarray(points, dtype=np.float32)
+    k = min(k, len(points))
+
+    # k-means++ seeding on a subsample
+    sample = points[rng.choice(len(points), size=min(len(points), 20 * batch_size), replace=False)]
+    centers = [sample[rng.integers(len(sample))]]
+    nearest = ((sample - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = nearest.sum()
+        if total <= 0:
+            break
+        centers.append(sample[rng.choice(len(sample), p=nearest / total)])
+        nearest = np.minimum(nearest, ((sample - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers, dtype=np.float32)
+
+    counts = np.zeros(len(centers))
+    for _ in range(iterations):
+        batch = points[rng.integers(len(points), size=min(batch_size, len(points)))]
+        labels = assign(batch, centers)
+        # Per-center learning rate 1 / (points seen so far)
+        batch_counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+        counts += batch_counts
+        moved = batch_counts > 0
+        rate = (batch_counts[moved] / counts[moved])[:, None]
+        centers[moved] += rate * (sums[moved] / batch_counts[moved][:, None] - centers[moved])
+    return centers
+
+
+def assign(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the nearest center for every point"""
+    distances = (
+        (points ** 2).sum(axis=1)[:, None]
+        - 2.0 * points @ centers.T
+        + (centers ** 2).sum(axis=1)[None, :]
+    )
+    return distances.argmin(axis=1)
+
+
+def merge_close_centers(centers: np.ndarray, counts: np.ndarray, delta_e: float):
+    """Fold centers within `delta_e` of a larger one into it (count-weighted mean)"""
+    order = np.argsort(-counts)
+    merged_centers: List[np.ndarray] = []
+    merged_counts: List[float] = []
+    for i in order:
+        if not counts[i]:
+            continue
+        for j, center in enumerate(merged_centers):
+            if np.linalg.norm(center - centers[i]) < delta_e:
+                total = merged_counts[j] + counts[i]
+                merged_centers[j] = (center * merged_counts[j] + centers[i] * counts[i]) / total
+                merged_counts[j] = total
+                break
+        else:
+            merged_centers.append(centers[i].astype(np.float64))
+            merged_counts.append(float(counts[i]))
+    return np.array(merged_centers), np.array(merged_counts)
+
+
+def build_palette(reservoir: PixelReservoir, num_colors: Optional[int] = None, seed: int = 0) -> List[Dict]:
+    """Cluster the pooled pixels once; colours sorted by share of the sample.
+
+    Entries carry hex, rgb, count (sampled pixels) and share; naming is left
+    to the caller.
+    """
+    if not len(reservoir.pixels):
+        return []
+    centers = minibatch_kmeans(reservoir.pixels, num_colors or settings.PALETTE_SIZE, seed=seed)
+    counts = np.bincount(assign(reservoir.pixels, centers), minlength=len(centers))
+    centers, counts = merge_close_centers(centers, counts, settings.PALETTE_MERGE_DELTA_E)
+
+    total = counts.sum()
+    palette = []
+    for (r, g, b), count in zip(lab_to_rgb(centers), counts):
+        palette.append({
+            "hex": f"#{r:02X}{g:02X}{b:02X}",
+            "rgb": {"r": int(r), "g": int(g), "b": int(b)},
+            "count": int(count),
+            "share": round(float(count / total), 4),
+        })
+    return sorted(palette, key=lambda x: x["count"], reverse=True)
+
+
+def palette_shift(previous: List[Dict], current: List[Dict]) -> float:
+    """How much the colour shares moved between two palettes (0 = identical, 1 = disjoint).
+
+    Each previous colour's share is credited to its nearest current colour
+    in Lab, and the result is the total variation distance between that
+    and the current shares.
+    """
+    if not previous or not current:
+        return 1.0
+    as_lab = lambda palette: rgb_to_lab(np.array([[c["rgb"]["r"], c["rgb"]["g"], c["rgb"]["b"]] for c in palette], dtype=np.uint8))
+    nearest = assign(as_lab(previous), as_lab(current))
+    mapped = np.bincount(nearest, weights=[c["share"] for c in previous], minlength=len(current))
+    shares = np.array([c["share"] for c in current])
+    return float(np.abs(mapped - shares).sum() / 2)
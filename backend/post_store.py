@@ -0,0 +1,213 @@
+"""
+Local store of scraped social posts.
+
+Normalized Instagram/Pinterest posts are persisted in SQLite, keyed on
+(platform, post_id) so re-scraped posts are deduplicated, with indexes on
+posted_at and on the hashtags/keywords each post is filed under. A fetch log
+records when each hashtag or keyword was last scraped:
+
+- terms fetched within the freshness window are answered from the store
+  without calling Apify at all
+- stale terms are re-scraped for posts newer than the newest stored one
+- the request's time_range becomes an indexed posted_at filter
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Epoch seconds from an ISO string or epoch number, None if unparseable"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value / 1000 if value > 1e11 else value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_time_range_days(time_range: str) -> Optional[int]:
+    """'30' / '30d' -> 30; anything else (e.g. 'all') means no filter"""
+    digits = str(time_range or "").strip().lower().rstrip("d")
+    return int(digits) if digits.isdigit() and int(digits) > 0 else None
+
+
+def normalize_term(term: str) -> str:
+    return term.strip().lstrip("#").lower()
+
+
+class PostStore:
+    """SQLite-backed post store with a per-term fetch log"""
+
+    def __init__(self, path: str, freshness_seconds: float):
+        self.path = path
+        self.freshness_seconds = freshness_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS posts (
+                    platform TEXT NOT NULL,
+                    post_id TEXT NOT NULL,
+                    posted_at REAL NOT NULL,
+                    scraped_at REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (platform, post_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_posts_platform_posted_at ON posts (platform, posted_at);
+
+                CREATE TABLE IF NOT EXISTS post_tags (
+                    tag TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    post_id TEXT NOT NULL,
+                    posted_at REAL NOT NULL,
+                    PRIMARY KEY (tag, platform, post_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_post_tags_tag_posted_at ON post_tags (tag, platform, posted_at);
+
+                CREATE TABLE IF NOT EXISTS fetch_log (
+                    platform TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (platform, term)
+                );
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    # ======================== FRESHNESS ========================
+
+    def fresh_terms(self, platform: str, terms: Iterable[str]) -> List[str]:
+        """Terms scraped recently enough to be served from the store"""
+        terms = list(terms)
+        if not terms:
+            return []
+        cutoff = time.time() - self.freshness_seconds
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT term FROM fetch_log WHERE platform = ? AND fetched_at >= ? AND term IN ({placeholders})",
+                (platform, cutoff, *terms),
+            ).fetchall()
+        fresh = {row[0] for row in rows}
+        return [t for t in terms if t in fresh]
+
+    def latest_posted_at(self, platform: str, terms: Iterable[str]) -> Dict[str, float]:
+        """Newest stored posted_at per term, for incremental fetches"""
+        terms = list(terms)
+        if not terms:
+            return {}
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT tag, MAX(posted_at) FROM post_tags WHERE platform = ? AND tag IN ({placeholders}) GROUP BY tag",
+                (platform, *terms),
+            ).fetchall()
+        return {tag: latest for tag, latest in rows}
+
+    def mark_fetched(self, platform: str, terms: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO fetch_log (platform, term, fetched_at) VALUES (?, ?, ?)",
+                [(platform, term, now) for term in terms],
+            )
+            conn.commit()
+
+    # ======================== POSTS ========================
+
+    def upsert(self, posts: List[Dict]) -> int:
+        """Store posts (deduplicated on platform + post_id); returns rows written.
+
+        Each post is filed under its own hashtags plus the query terms that
+        found it (post["query_terms"]). Posts without a timestamp are dated
+        by when they were first scraped; later upserts keep that date.
+        """
+        now = time.time()
+        post_rows = []
+        tag_rows = []
+        for post in posts:
+            post_id = post.get("post_id")
+            if not post_id:
+                continue
+            platform = post["platform"]
+            posted_at = parse_timestamp(post.get("posted_at"))
+
+            query_terms = [normalize_term(t) for t in post.get("query_terms", [])]
+            own_tags = {normalize_term(t) for t in post.get("hashtags", [])}
+            text = " ".join(str(post.get(k) or "") for k in ("caption", "description", "title")).lower()
+            # File under the query terms the post actually mentions, or all of them if none match
+            matched = [t for t in query_terms if t in own_tags or t in text] or query_terms
+
+            data = {k: v for k, v in post.items() if k != "query_terms"}
+            post_rows.append((platform, post_id, posted_at, platform, post_id, now, now, json.dumps(data, ensure_ascii=False)))
+            tag_rows.extend((tag, platform, post_id) for tag in own_tags.union(matched) if tag)
+
+        with self._lock:
+            conn = self._connect()
+            # Undated posts keep the posted_at of their existing row, else get now
+            conn.executemany(
+                """INSERT OR REPLACE INTO posts (platform, post_id, posted_at, scraped_at, data)
+                   VALUES (?, ?, COALESCE(?, (SELECT posted_at FROM posts WHERE platform = ? AND post_id = ?), ?), ?, ?)""",
+                post_rows,
+            )
+            # Tags take the date just resolved for their post
+            conn.executemany(
+                """INSERT OR REPLACE INTO post_tags (tag, platform, post_id, posted_at)
+                   SELECT ?, platform, post_id, posted_at FROM posts WHERE platform = ? AND post_id = ?""",
+                tag_rows,
+            )
+            conn.commit()
+        return len(post_rows)
+
+    def query(self, platform: str, terms: Iterable[str], since: Optional[float] = None, limit: int = 500) -> List[Dict]:
+        """Newest posts filed under any of the terms, optionally posted after `since`"""
+        terms = list(terms)
+        if not terms:
+            return []
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._connect().execute(
+                f"""SELECT p.data FROM posts p
+                    JOIN (
+                        SELECT DISTINCT post_id FROM post_tags
+                        WHERE platform = ? AND tag IN ({placeholders}) AND posted_at >= ?
+                    ) t ON t.post_id = p.post_id
+                    WHERE p.platform = ?
+                    ORDER BY p.posted_at DESC
+                    LIMIT ?""",
+                (platform, *terms, since or 0.0, platform, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            conn = self._connect()
+            by_platform = dict(conn.execute("SELECT platform, COUNT(*) FROM posts GROUP BY platform").fetchall())
+            terms = conn.execute("SELECT COUNT(*) FROM fetch_log").fetchone()[0]
+        return {
+            "posts": by_platform,
+            "tracked_terms": terms,
+            "freshness_seconds": self.freshness_seconds,
+        }
+
+
+post_store = PostStore(
+    path=settings.POST_STORE_PATH,
+    freshness_seconds=settings.POST_STORE_FRESHNESS_SECONDS,
+)
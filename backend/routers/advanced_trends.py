@@ -1,25 +1,33 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict
-from groq import Groq
-import httpx
-import cv2
+from typing import AsyncIterator, List, Dict, Optional
+import asyncio
+import time
 import numpy as np
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from collections import Counter
 import re
+from contextlib import aclosing
+
+from config import settings
+from image_fetcher import image_fetcher
+from keyword_index import keyword_index
+from llm_gateway import chat_completion
+from palette import PixelReservoir, build_palette, image_lab_pixels, palette_shift
+from post_store import normalize_term, parse_time_range_days, parse_timestamp, post_store
+from trend_forecast import forecast_theme
+from trend_history import METRICS, day_number, trend_history
 
 # Import official Apify SDK
 try:
-    from apify_client import ApifyClient
+    from apify_client import ApifyClientAsync
     APIFY_AVAILABLE = True
 except ImportError:
     APIFY_AVAILABLE = False
     print("⚠️ Apify SDK not installed. Install with: pip install apify-client")
 
 router = APIRouter()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 apify_api_key = os.getenv("APIFY_API_KEY")
 
 class TrendAnalysisRequest(BaseModel):
@@ -31,46 +39,10 @@ class TrendAnalysisRequest(BaseModel):
     time_range: str = "30"
     output_format: str = "detailed"
     depth: str = "detailed"
+    weight_colors_by_engagement: bool = False
+    adaptive_colors: Optional[bool] = None     # None: adaptive when there are many images
 
 class ColorAnalysis:
-    @staticmethod
-    def extract_colors(image_url: str, num_colors: int = 5) -> List[Dict]:
-        """Extract dominant colors from image"""
-        try:
-            response = httpx.get(image_url, timeout=10)
-            img_array = np.frombuffer(response.content, np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                return []
-            
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            img_resized = cv2.resize(img_rgb, (150, 150))
-            pixels = img_resized.reshape((-1, 3))
-            pixels = np.float32(pixels)
-            
-            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
-            _, labels, centers = cv2.kmeans(pixels, num_colors, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
-            
-            centers = np.uint8(centers)
-            colors = []
-            
-            for i, center in enumerate(centers):
-                r, g, b = int(center[0]), int(center[1]), int(center[2])
-                hex_color = f"#{r:02x}{g:02x}{b:02x}".upper()
-                percentage = (np.sum(labels == i) / len(labels)) * 100
-                colors.append({
-                    "hex": hex_color,
-                    "rgb": {"r": r, "g": g, "b": b},
-                    "percentage": round(percentage, 1),
-                    "name": ColorAnalysis.get_color_name(r, g, b)
-                })
-            
-            return sorted(colors, key=lambda x: x["percentage"], reverse=True)
-        except Exception as e:
-            print(f"Color extraction error: {e}")
-            return []
-    
     @staticmethod
     def get_color_name(r: int, g: int, b: int) -> str:
         """Convert RGB to color name"""
@@ -94,99 +66,289 @@ class ColorAnalysis:
 
 # ======================== REAL APIFY SCRAPING (WORKING) ========================
 
-async def scrape_instagram_real(hashtags: List[str]) -> Dict:
-    """Real Instagram scraping using official Apify SDK"""
+_apify_client = None
+
+def get_apify_client():
+    """One shared async Apify client, so actor runs never block the event loop"""
+    global _apify_client
+    if _apify_client is None:
+        _apify_client = ApifyClientAsync(apify_api_key)
+    return _apify_client
+
+async def run_apify_actor(actor_id: str, run_input: Dict, timeout_seconds: float) -> str:
+    """Start an actor run, wait for it to finish and return its dataset id.
+
+    The run gets the same timeout on Apify's side; if we stop waiting first
+    the run is aborted so it doesn't keep using credits.
+    """
+    client = get_apify_client()
+    run = await client.actor(actor_id).start(run_input=run_input, timeout_secs=int(timeout_seconds))
+    run_client = client.run(run["id"])
     try:
-        if not APIFY_AVAILABLE:
-            raise Exception("Apify SDK not installed")
-        
-        print("📱 Scraping Instagram via Apify SDK...")
-        
-        client = ApifyClient(apify_api_key)
-        
-        # Use the correct actor ID
-        actor_id = "apify/instagram-hashtag-scraper"
-        
-        run_input = {
-            "hashtags": [h.lstrip("#") for h in hashtags[:3]],
-            "resultsLimit": 50,
-            "resultsType": "posts"
-        }
-        
-        print(f"Input: {run_input}")
-        
-        # This is the correct way to call Apify
-        run = client.actor(actor_id).call(run_input=run_input)
-        
-        dataset_client = client.dataset(run["defaultDatasetId"])
-        items = list(dataset_client.iterate_items())
-        
-        posts = []
-        for item in items[:50]:
-            posts.append({
-                "platform": "instagram",
-                "caption": item.get("caption", ""),
-                "likes": item.get("likesCount", 0),
-                "comments": item.get("commentsCount", 0),
-                "hashtags": extract_hashtags(item.get("caption", "")),
-                "image_url": item.get("displayUrl", ""),
-                "posted_at": item.get("timestamp", ""),
-                "author": item.get("ownerUsername", ""),
-            })
-        
-        print(f"✅ Instagram: {len(posts)} posts scraped")
-        return {"success": True, "posts": posts, "count": len(posts)}
-        
-    except Exception as e:
-        print(f"❌ Instagram error: {str(e)}")
-        return {"success": False, "posts": [], "error": str(e)}
+        await asyncio.wait_for(run_client.wait_for_finish(), timeout=timeout_seconds)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        try:
+            await run_client.abort()
+        except Exception as e:
+            print(f"⚠️ Could not abort Apify run {run['id']}: {e}")
+        raise
+    return run["defaultDatasetId"]
 
-async def scrape_pinterest_real(keywords: List[str]) -> Dict:
-    """Real Pinterest scraping using official Apify SDK"""
+async def iterate_dataset(dataset_id: str, limit: int) -> AsyncIterator[Dict]:
+    """Stream dataset items page by page instead of loading the whole dataset"""
+    async for item in get_apify_client().dataset(dataset_id).iterate_items(limit=limit):
+        yield item
+
+def normalize_instagram_item(item: Dict) -> Dict:
+    return {
+        "platform": "instagram",
+        "post_id": str(item.get("id") or item.get("shortCode") or item.get("url") or ""),
+        "caption": item.get("caption", ""),
+        "likes": item.get("likesCount", 0),
+        "comments": item.get("commentsCount", 0),
+        "hashtags": extract_hashtags(item.get("caption", "")),
+        "image_url": item.get("displayUrl", ""),
+        "posted_at": item.get("timestamp", ""),
+        "author": item.get("ownerUsername", ""),
+    }
+
+def normalize_pinterest_item(item: Dict) -> Dict:
+    return {
+        "platform": "pinterest",
+        "post_id": str(item.get("id") or item.get("url") or item.get("imageUrl") or ""),
+        "posted_at": item.get("createdAt", ""),
+        "description": item.get("description", ""),
+        "title": item.get("title", ""),
+        "saves": item.get("saveCount", 0),
+        "likes": item.get("likeCount", 0),
+        "image_url": item.get("imageUrl", ""),
+        "source_url": item.get("sourceUrl", ""),
+        "hashtags": extract_hashtags(item.get("description", "")),
+    }
+
+async def stream_instagram_shard(
+    hashtags: List[str], limit: int, timeout_seconds: float, newer_than: Optional[float] = None
+) -> AsyncIterator[Dict]:
+    """Posts for one shard of hashtags, as they are read from the dataset"""
+    # Use the correct actor ID
+    actor_id = "apify/instagram-hashtag-scraper"
+    run_input = {
+        "hashtags": hashtags,
+        "resultsLimit": limit,
+        "resultsType": "posts"
+    }
+    if newer_than:
+        # Incremental fetch: skip posts we already have
+        run_input["onlyPostsNewerThan"] = datetime.fromtimestamp(newer_than, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    print(f"Input: {run_input}")
+    
+    dataset_id = await run_apify_actor(actor_id, run_input, timeout_seconds)
+    async for item in iterate_dataset(dataset_id, limit=limit):
+        yield normalize_instagram_item(item)
+
+async def stream_pinterest_shard(
+    keywords: List[str], limit: int, timeout_seconds: float, newer_than: Optional[float] = None
+) -> AsyncIterator[Dict]:
+    """Pins for one shard of keywords, as they are read from the dataset"""
+    # Use the correct actor ID
+    actor_id = "apify/pinterest-scraper"
+    run_input = {
+        "keywords": keywords,
+        "resultsLimit": limit,
+        "maxRequests": limit
+    }
+    print(f"Input: {run_input}")
+    
+    dataset_id = await run_apify_actor(actor_id, run_input, timeout_seconds)
+    async for item in iterate_dataset(dataset_id, limit=limit):
+        yield normalize_pinterest_item(item)
+
+class ResultBudget:
+    """Cap on the posts kept across every shard of one request"""
+    
+    def __init__(self, limit: int):
+        self.remaining = limit
+    
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+    
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+def make_shards(terms: List[str], shard_size: int) -> List[List[str]]:
+    """Deduplicate the inputs and split them into actor-sized shards"""
+    unique = list(dict.fromkeys(t.strip().lstrip("#").lower() for t in terms if t and t.strip().lstrip("#")))
+    return [unique[i:i + shard_size] for i in range(0, len(unique), shard_size)]
+
+async def scrape_sharded(
+    platform: str,
+    terms: List[str],
+    stream_shard,
+    budget: ResultBudget,
+    newer_than: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Fan one platform's inputs out over shards with bounded parallelism.
+
+    Posts are merged and deduplicated by post id as they stream in; once the
+    shared result budget is spent, running shards stop reading and shards
+    that haven't started are skipped. `newer_than` maps terms to the newest
+    post already stored for them; a shard whose terms all have history only
+    keeps posts newer than the oldest of those.
+    
+    Each shard (actor run plus dataset read) gets APIFY_SHARD_TIMEOUT_SECONDS
+    and the platform as a whole APIFY_PLATFORM_TIMEOUT_SECONDS; posts read
+    before either runs out are kept.
+    """
+    if not APIFY_AVAILABLE:
+        return {"success": False, "posts": [], "count": 0, "error": "Apify SDK not installed", "shards": []}
+    
+    shards = make_shards(terms, settings.APIFY_SHARD_SIZE)
+    if not shards:
+        return {"success": False, "posts": [], "count": 0, "error": "No hashtags or keywords given", "shards": []}
+    
+    print(f"🔀 Scraping {platform} via Apify SDK: {sum(len(s) for s in shards)} terms in {len(shards)} shards...")
+    
+    semaphore = asyncio.Semaphore(settings.APIFY_MAX_PARALLEL_SHARDS)
+    shard_timeout = settings.APIFY_SHARD_TIMEOUT_SECONDS
+    platform_timeout = settings.APIFY_PLATFORM_TIMEOUT_SECONDS
+    seen_ids = set()
+    posts = []
+    statuses = [
+        {"shard": i, "inputs": shard, "success": False, "posts": 0, "duplicates": 0, "seconds": 0.0, "error": None}
+        for i, shard in enumerate(shards)
+    ]
+    
+    async def read_shard(status: Dict, cutoff: Optional[float]):
+        async with aclosing(stream_shard(
+            status["inputs"], settings.APIFY_RESULTS_PER_SHARD, shard_timeout, cutoff
+        )) as stream:
+            async for post in stream:
+                if post["post_id"] and post["post_id"] in seen_ids:
+                    status["duplicates"] += 1
+                    continue
+                posted_at = parse_timestamp(post.get("posted_at"))
+                if cutoff and posted_at and posted_at <= cutoff:
+                    status["duplicates"] += 1
+                    continue
+                post["query_terms"] = status["inputs"]
+                if not budget.take():
+                    break
+                seen_ids.add(post["post_id"])
+                posts.append(post)
+                status["posts"] += 1
+    
+    async def run_shard(status: Dict):
+        async with semaphore:
+            if budget.exhausted:
+                status["error"] = "Skipped: result budget exhausted"
+                return
+            
+            started = time.perf_counter()
+            history = [(newer_than or {}).get(term) for term in status["inputs"]]
+            cutoff = min(history) if history and all(history) else None
+            try:
+                await asyncio.wait_for(read_shard(status, cutoff), timeout=shard_timeout)
+                status["success"] = True
+            except asyncio.TimeoutError:
+                status["error"] = f"Timed out after {shard_timeout}s"
+            except Exception as e:
+                status["error"] = str(e)
+            status["seconds"] = round(time.perf_counter() - started, 2)
+            
+            print(f"{'✅' if status['success'] else '❌'} {platform} shard {status['shard']}: "
+                  f"{status['posts']} posts, {status['duplicates']} duplicates"
+                  + (f" ({status['error']})" if status["error"] else ""))
+    
     try:
-        if not APIFY_AVAILABLE:
-            raise Exception("Apify SDK not installed")
-        
-        print("📌 Scraping Pinterest via Apify SDK...")
-        
-        client = ApifyClient(apify_api_key)
-        
-        # Use the correct actor ID
-        actor_id = "apify/pinterest-scraper"
-        
-        run_input = {
-            "keywords": keywords[:3],
-            "resultsLimit": 50,
-            "maxRequests": 50
-        }
-        
-        print(f"Input: {run_input}")
-        
-        # This is the correct way to call Apify
-        run = client.actor(actor_id).call(run_input=run_input)
-        
-        dataset_client = client.dataset(run["defaultDatasetId"])
-        items = list(dataset_client.iterate_items())
-        
-        pins = []
-        for item in items[:50]:
-            pins.append({
-                "platform": "pinterest",
-                "description": item.get("description", ""),
-                "title": item.get("title", ""),
-                "saves": item.get("saveCount", 0),
-                "likes": item.get("likeCount", 0),
-                "image_url": item.get("imageUrl", ""),
-                "source_url": item.get("sourceUrl", ""),
-                "hashtags": extract_hashtags(item.get("description", "")),
-            })
-        
-        print(f"✅ Pinterest: {len(pins)} pins scraped")
-        return {"success": True, "posts": pins, "count": len(pins)}
-        
-    except Exception as e:
-        print(f"❌ Pinterest error: {str(e)}")
-        return {"success": False, "posts": [], "error": str(e)}
+        await asyncio.wait_for(
+            asyncio.gather(*(run_shard(status) for status in statuses)), timeout=platform_timeout
+        )
+    except asyncio.TimeoutError:
+        # Cancelling aborts the actor runs still going; what was read so far is kept
+        for status in statuses:
+            if not status["success"] and not status["error"]:
+                status["error"] = f"{platform.capitalize()} timed out after {platform_timeout}s"
+        print(f"⏱️ {platform.capitalize()} budget of {platform_timeout}s spent; keeping {len(posts)} posts")
+    
+    succeeded = any(status["success"] for status in statuses)
+    errors = list(dict.fromkeys(status["error"] for status in statuses if status["error"]))
+    print(f"✅ {platform.capitalize()}: {len(posts)} posts from {len(shards)} shards")
+    return {
+        "success": succeeded,
+        "posts": posts,
+        "count": len(posts),
+        "error": None if succeeded else "; ".join(errors),
+        "shards": statuses,
+    }
+
+async def collect_platform_posts(
+    platform: str,
+    terms: List[str],
+    stream_shard,
+    budget: ResultBudget,
+    since: Optional[float] = None,
+) -> Dict:
+    """Serve recently fetched terms from the post store and scrape only the rest.
+
+    Stale terms are scraped incrementally (posts newer than the newest stored
+    one), merged into the store, and the answer is read back from the store
+    filtered to posts newer than `since`. Store calls (SQLite) run in worker
+    threads so they don't block the event loop.
+    """
+    terms = list(dict.fromkeys(normalize_term(t) for t in terms if normalize_term(t)))
+    fresh_terms = await asyncio.to_thread(post_store.fresh_terms, platform, terms)
+    stale_terms = [t for t in terms if t not in fresh_terms]
+    
+    scraped = {"success": True, "posts": [], "count": 0, "error": None, "shards": []}
+    if stale_terms:
+        newer_than = await asyncio.to_thread(post_store.latest_posted_at, platform, stale_terms)
+        scraped = await scrape_sharded(platform, stale_terms, stream_shard, budget, newer_than)
+        await asyncio.to_thread(post_store.upsert, scraped["posts"])
+        await asyncio.to_thread(
+            post_store.mark_fetched,
+            platform, [t for shard in scraped["shards"] if shard["success"] for t in shard["inputs"]],
+        )
+    else:
+        print(f"🗄️ {platform.capitalize()}: all {len(terms)} terms fresh in the post store, skipping Apify")
+    
+    posts = await asyncio.to_thread(post_store.query, platform, terms, since, settings.APIFY_RESULT_BUDGET)
+    return {
+        "success": bool(posts) or scraped["success"],
+        "posts": posts,
+        "count": len(posts),
+        "scraped": scraped["count"],
+        "fresh_terms": fresh_terms,
+        "scraped_terms": stale_terms,
+        "error": scraped["error"],
+        "shards": scraped["shards"],
+    }
+
+async def scrape_instagram_real(
+    hashtags: List[str], budget: Optional[ResultBudget] = None, since: Optional[float] = None
+) -> Dict:
+    """Real Instagram scraping using official Apify SDK"""
+    return await collect_platform_posts(
+        "instagram", hashtags, stream_instagram_shard, budget or ResultBudget(settings.APIFY_RESULT_BUDGET), since
+    )
+
+async def scrape_pinterest_real(
+    keywords: List[str], budget: Optional[ResultBudget] = None, since: Optional[float] = None
+) -> Dict:
+    """Real Pinterest scraping using official Apify SDK"""
+    return await collect_platform_posts(
+        "pinterest", keywords, stream_pinterest_shard, budget or ResultBudget(settings.APIFY_RESULT_BUDGET), since
+    )
+
+async def timed_scrape(scrape) -> Dict:
+    """Run one platform scrape and record how long it took"""
+    started = time.perf_counter()
+    result = await scrape
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
 
 def extract_hashtags(text: str) -> List[str]:
     """Extract hashtags from text"""
@@ -195,57 +357,113 @@ def extract_hashtags(text: str) -> List[str]:
 # ======================== ANALYSIS ========================
 
 def extract_hashtags_keywords(posts: List[Dict]) -> Dict:
-    """Extract and analyze hashtags and keywords"""
+    """Extract and analyze hashtags and keywords (keywords ranked by TF-IDF)"""
     all_hashtags = []
-    all_text = []
     
     for post in posts:
         if "hashtags" in post:
             all_hashtags.extend(post["hashtags"])
-        text = (post.get("caption", "") or post.get("description", "") or post.get("title", ""))
-        if text:
-            all_text.append(text)
     
     hashtag_counter = Counter(all_hashtags)
     top_hashtags = hashtag_counter.most_common(15)
     
-    keywords = []
-    for text in all_text:
-        words = re.findall(r'\b\w+\b', text.lower())
-        keywords.extend([w for w in words if len(w) > 3])
-    
-    keyword_counter = Counter(keywords)
-    top_keywords = keyword_counter.most_common(10)
-    
     return {
         "top_hashtags": [{"tag": tag, "count": count} for tag, count in top_hashtags],
-        "top_keywords": [{"keyword": kw, "count": count} for kw, count in top_keywords],
+        "top_keywords": keyword_index.extract(posts, top_n=10),
         "total_posts": len(posts),
         "total_unique_hashtags": len(hashtag_counter),
     }
 
-def extract_dominant_colors(posts: List[Dict]) -> List[Dict]:
-    """Extract colors from images"""
-    all_colors = []
+def engagement_weight(post: Dict) -> float:
+    """Sampling weight for a post's image: grows with the log of its likes, comments and saves"""
+    engagement = sum(post.get(k) or 0 for k in ("likes", "comments", "saves"))
+    return 1.0 + float(np.log1p(max(engagement, 0)))
+
+async def extract_dominant_colors(
+    posts: List[Dict],
+    weight_by_engagement: bool = False,
+    adaptive: Optional[bool] = None,
+    sampling: Optional[Dict] = None,
+) -> List[Dict]:
+    """Extract the global color palette of the posts' images.
     
+    Downloads run concurrently through the shared image fetcher; each image is
+    decoded to Lab pixels in a worker thread as it arrives and offered to one
+    pooled pixel reservoir, which is clustered into the palette.
+    
+    In adaptive mode images are taken in engagement-ranked batches and
+    sampling stops once a batch moves the palette shares by less than
+    PALETTE_ADAPTIVE_TOLERANCE. If a `sampling` dict is passed it is filled
+    with the images consumed and the confidence reached (1 - last shift).
+    """
+    engagement = {}
     for post in posts:
-        image_url = post.get("image_url")
-        if image_url and image_url.startswith("http"):
-            colors = ColorAnalysis.extract_colors(image_url, num_colors=3)
-            if colors:
-                all_colors.extend(colors)
+        url = post.get("image_url") or ""
+        if url.startswith("http") and url not in engagement:
+            engagement[url] = engagement_weight(post)
+    if adaptive is None:
+        adaptive = len(engagement) >= settings.PALETTE_ADAPTIVE_MIN_IMAGES
+    urls = sorted(engagement, key=engagement.get, reverse=True) if adaptive else list(engagement)
+    urls = urls[:settings.IMAGE_FETCH_MAX_IMAGES]
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IMAGE_FETCH_BUDGET_SECONDS
+    started = time.perf_counter()
+    reservoir = PixelReservoir()
+    sampling = sampling if sampling is not None else {}
+    sampling.update({
+        "mode": "adaptive" if adaptive else "full",
+        "images_available": len(urls),
+        "images_downloaded": 0,
+        "images_used": 0,
+        "failed": 0,
+        "timed_out": 0,
+        "batches": 0,
+        "converged": False,
+        "confidence": None,
+    })
     
-    if not all_colors:
-        return []
+    async def sample_image(url: str, content: bytes):
+        pixels = await asyncio.to_thread(image_lab_pixels, content)
+        reservoir.add(pixels, engagement[url] if weight_by_engagement else 1.0)
     
-    color_dict = {}
-    for color in all_colors:
-        hex_val = color["hex"]
-        if hex_val not in color_dict:
-            color_dict[hex_val] = {"hex": hex_val, "name": color["name"], "count": 0, "rgb": color["rgb"]}
-        color_dict[hex_val]["count"] += 1
+    palette = []
+    batch_size = settings.PALETTE_ADAPTIVE_BATCH if adaptive else max(len(urls), 1)
+    for start in range(0, len(urls), batch_size):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        stats = {}
+        decoding = []
+        async for url, content in image_fetcher.fetch(urls[start:start + batch_size], remaining, stats):
+            decoding.append(asyncio.create_task(sample_image(url, content)))
+        await asyncio.gather(*decoding)
+        sampling["batches"] += 1
+        sampling["images_downloaded"] += stats["fetched"]
+        sampling["failed"] += stats["failed"]
+        sampling["timed_out"] += stats["timed_out"]
+        
+        if not adaptive:
+            continue
+        current = await asyncio.to_thread(build_palette, reservoir)
+        if palette and current:
+            shift = palette_shift(palette, current)
+            sampling["confidence"] = round(1.0 - shift, 4)
+            if shift <= settings.PALETTE_ADAPTIVE_TOLERANCE and sampling["batches"] >= settings.PALETTE_ADAPTIVE_MIN_BATCHES:
+                sampling["converged"] = True
+                palette = current
+                break
+        palette = current
     
-    return sorted(color_dict.values(), key=lambda x: x["count"], reverse=True)[:10]
+    if not adaptive:
+        palette = await asyncio.to_thread(build_palette, reservoir)
+    for color in palette:
+        color["name"] = ColorAnalysis.get_color_name(**color["rgb"])
+    sampling["images_used"] = reservoir.images
+    sampling["seconds"] = round(time.perf_counter() - started, 2)
+    print(f"🎨 Palette from {reservoir.images}/{len(urls)} images in {sampling['batches']} batches "
+          f"({sampling['mode']}, confidence {sampling['confidence']}) in {sampling['seconds']}s")
+    return palette
 
 async def generate_ai_insights(theme: str, posts: List[Dict], colors: List[Dict], analysis: Dict) -> str:
     """Generate AI insights using Groq"""
@@ -283,14 +501,12 @@ Provide a detailed trend forecast with:
 
 Be specific and data-driven based on the actual posts."""
 
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+        return await chat_completion(
+            [{"role": "user", "content": prompt}],
+            task="trend_forecast",
             temperature=0.7,
             max_tokens=2000
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         return f"Analysis complete with {len(posts)} posts scraped and analyzed."
 
@@ -332,25 +548,29 @@ async def analyze_advanced_trends(req: TrendAnalysisRequest):
         
         all_posts = []
         
-        # Scrape Instagram
+        # Scrape all requested platforms concurrently: wall time is the slowest platform, not the sum
+        # Large hashtag/keyword lists are sharded; one result budget covers the whole request
+        budget = ResultBudget(settings.APIFY_RESULT_BUDGET)
+        time_range_days = parse_time_range_days(req.time_range)
+        since = time.time() - time_range_days * 86400 if time_range_days else None
+        scrapes = {}
         if "instagram" in req.platforms:
-            insta = await scrape_instagram_real(req.hashtags)
-            results["scraping_status"]["instagram"] = {
-                "success": insta["success"],
-                "posts": insta.get("count", 0),
-                "error": insta.get("error")
-            }
-            all_posts.extend(insta.get("posts", []))
-        
-        # Scrape Pinterest
+            scrapes["instagram"] = timed_scrape(scrape_instagram_real(req.hashtags, budget, since))
         if "pinterest" in req.platforms:
-            pinterest = await scrape_pinterest_real(req.keywords)
-            results["scraping_status"]["pinterest"] = {
-                "success": pinterest["success"],
-                "posts": pinterest.get("count", 0),
-                "error": pinterest.get("error")
+            scrapes["pinterest"] = timed_scrape(scrape_pinterest_real(req.keywords, budget, since))
+        
+        for platform, scraped in zip(scrapes, await asyncio.gather(*scrapes.values())):
+            results["scraping_status"][platform] = {
+                "success": scraped["success"],
+                "posts": scraped.get("count", 0),
+                "newly_scraped": scraped.get("scraped", 0),
+                "fresh_terms": scraped.get("fresh_terms", []),
+                "scraped_terms": scraped.get("scraped_terms", []),
+                "seconds": scraped["seconds"],
+                "error": scraped.get("error"),
+                "shards": scraped.get("shards", [])
             }
-            all_posts.extend(pinterest.get("posts", []))
+            all_posts.extend(scraped.get("posts", []))
         
         if not all_posts:
             raise HTTPException(
@@ -361,16 +581,26 @@ async def analyze_advanced_trends(req: TrendAnalysisRequest):
         print(f"📊 Total posts: {len(all_posts)}")
         
         # Analyze
-        hashtag_analysis = extract_hashtags_keywords(all_posts)
+        # Tokenizing, TF-IDF and the corpus update (SQLite) run off the event loop
+        hashtag_analysis = await asyncio.to_thread(extract_hashtags_keywords, all_posts)
         results["analysis"]["hashtags"] = hashtag_analysis
         
-        dominant_colors = extract_dominant_colors(all_posts)
+        color_sampling = {}
+        dominant_colors = await extract_dominant_colors(
+            all_posts, req.weight_colors_by_engagement, req.adaptive_colors, color_sampling
+        )
         results["analysis"]["dominant_colors"] = dominant_colors
+        results["analysis"]["color_sampling"] = color_sampling
         
         # DYNAMIC: Analyze styles from actual posts
         popular_styles = analyze_popular_styles(all_posts)
         results["analysis"]["popular_styles"] = popular_styles
         
+        # Keep today's rollup so the theme's trends can be charted over time
+        await asyncio.to_thread(trend_history.record, req.theme, results["analysis"])
+        results["insights"]["hashtag_forecast"] = await asyncio.to_thread(forecast_theme, req.theme, "hashtag", limit=10)
+        results["insights"]["style_forecast"] = await asyncio.to_thread(forecast_theme, req.theme, "style", limit=6)
+        
         ai_forecast = await generate_ai_insights(
             req.theme,
             all_posts,
@@ -411,6 +641,7 @@ async def analyze_advanced_trends(req: TrendAnalysisRequest):
             "pinterest": pinterest_count,
             "unique_hashtags": hashtag_analysis["total_unique_hashtags"],
             "analysis_depth": req.depth,
+            "time_range_days": time_range_days,
         }
         
         return {
@@ -425,6 +656,62 @@ async def analyze_advanced_trends(req: TrendAnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/history")
+async def trend_history_series(
+    theme: str,
+    metric: str = "hashtag",
+    keys: Optional[str] = None,
+    days: int = 90,
+    limit: int = 10,
+):
+    """Daily series for a theme from stored rollups.
+
+    `keys` is a comma-separated list (hashtags, keywords, styles or color
+    hexes); without it the `limit` keys with the largest totals are returned.
+    """
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(METRICS)}")
+    
+    started = time.perf_counter()
+    end_day = day_number()
+    start_day = end_day - max(days, 1) + 1
+    if keys:
+        wanted = [k.strip().lower() for k in keys.split(",") if k.strip()]
+        if metric == "hashtag":
+            wanted = [k.lstrip("#") for k in wanted]
+    else:
+        wanted = await asyncio.to_thread(trend_history.top_keys, theme, metric, start_day, end_day, limit)
+    series = await asyncio.to_thread(trend_history.series, theme, metric, wanted, start_day, end_day)
+    
+    return {
+        "success": True,
+        "theme": theme,
+        "metric": metric,
+        "days": days,
+        "series": series,
+        "query_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@router.get("/forecast")
+async def trend_forecast(theme: str, metric: str = "hashtag", days: int = 90, horizon: int = 7, limit: int = 20):
+    """Growth rate, acceleration and a short forecast for every stored series, fastest growing first"""
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(METRICS)}")
+    
+    started = time.perf_counter()
+    forecasts = await asyncio.to_thread(forecast_theme, theme, metric, days=days, horizon=horizon, limit=limit)
+    
+    return {
+        "success": True,
+        "theme": theme,
+        "metric": metric,
+        "horizon_days": horizon,
+        "forecasts": forecasts,
+        "query_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
 @router.get("/status")
 async def scraper_status():
     """Check scraper configuration"""
@@ -434,6 +721,9 @@ async def scraper_status():
         "apify_api_key_set": bool(apify_api_key),
         "scraping_method": "Official Apify Python SDK",
         "platforms": ["instagram", "pinterest"],
+        "post_store": post_store.stats(),
+        "trend_history": trend_history.stats(),
+        "keyword_index": keyword_index.stats(),
         "setup_commands": [
             "pip install apify-client",
             "Add APIFY_API_KEY to .env"
@@ -6,7 +6,6 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
-from groq import Groq
 import os
 import cv2
 import numpy as np
@@ -17,7 +16,6 @@ import math
 from enum import Enum
 
 router = APIRouter()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 # ======================== ENUMS ========================
 
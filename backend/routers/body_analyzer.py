@@ -3,13 +3,11 @@
 
 from fastapi import APIRouter, HTTPException, File, UploadFile
 from pydantic import BaseModel
-from groq import Groq
 import base64
 import json
-import os
+from llm_gateway import chat_completion
 
 router = APIRouter()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 class BodyAnalysisResponse(BaseModel):
     height_estimate: float
@@ -55,20 +53,14 @@ async def analyze_body_from_image(file: UploadFile = File(...)):
         print(f"📊 Analyzing body measurements...\n")
 
         # Use Groq's vision to analyze body
-        message = groq_client.messages.create(
-            model="gpt-4-vision-preview",  # Using vision capability
-            max_tokens=2048,
-            messages=[
+        response_text = await chat_completion(
+            [
                 {
                     "role": "user",
                     "content": [
                         {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": base64_image,
-                            },
+                            "type": "image_url",
+                            "image_url": {"url": f"data:{media_type};base64,{base64_image}"},
                         },
                         {
                             "type": "text",
@@ -108,10 +100,13 @@ Return as JSON:
                     ],
                 }
             ],
+            task="body_analysis",
+            temperature=0.2,
+            max_tokens=2048,
         )
 
         # Parse response
-        response_text = message.content[0].text.strip()
+        response_text = response_text.strip()
         
         # Extract JSON from response
         try:
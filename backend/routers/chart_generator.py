@@ -6,6 +6,8 @@ import base64
 from typing import List, Dict
 import json
 
+from style_lexicon import style_matcher
+
 def generate_hashtag_bar_chart(top_hashtags: List[Dict]) -> str:
     """Generate bar chart for top hashtags"""
     try:
@@ -176,28 +178,10 @@ def generate_platform_pie_chart(instagram_count: int, pinterest_count: int) -> s
 def analyze_popular_styles(posts: List[Dict]) -> List[Dict]:
     """Dynamically extract popular styles from actual posts"""
     try:
-        style_keywords = {
-            "oversized": ["oversized", "baggy", "loose fit", "relaxed"],
-            "vintage": ["vintage", "retro", "90s", "80s", "throwback"],
-            "minimalist": ["minimal", "clean", "simple", "neutral"],
-            "streetwear": ["street", "urban", "hype", "sneaker"],
-            "y2k": ["y2k", "2000s", "early 2000", "throwback"],
-            "maximalist": ["bold", "statement", "loud", "colorful"],
-            "sustainable": ["eco", "sustainable", "organic", "recycled"],
-            "preppy": ["preppy", "classic", "polo", "structured"],
-            "athleisure": ["athletic", "sporty", "gym", "casual"],
-            "bohemian": ["boho", "festival", "hippie", "free"],
-        }
-        
-        style_scores = {style: 0 for style in style_keywords}
-        
-        # Analyze posts
-        for post in posts:
-            text = (post.get("caption", "") or post.get("description", "") or "").lower()
-            for style, keywords in style_keywords.items():
-                for keyword in keywords:
-                    if keyword in text:
-                        style_scores[style] += 1
+        # One pass per caption with the compiled lexicon, counting every style at once
+        style_scores = style_matcher.count_styles(
+            post.get("caption", "") or post.get("description", "") or "" for post in posts
+        )
         
         # Get top 6 styles
         sorted_styles = sorted(style_scores.items(), key=lambda x: x[1], reverse=True)
@@ -1,20 +1,18 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import os
 import cv2
 import numpy as np
 from io import BytesIO
 from PIL import Image
-from groq import Groq
-import json
+from llm_gateway import CircuitOpenError, chat_completion, stream_chat_completion
+from sse import sse_event
+from streaming_json import StreamingJSONParser
 
 # Initialize router
 router = APIRouter()
 
-# Initialize Groq LLM
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
 # Pydantic Models
 class ColorInfo(BaseModel):
     hex: str
@@ -42,6 +40,27 @@ class AnalysisResponse(BaseModel):
     llm_recommendations: List[RecommendationInfo]
     llm_analysis_summary: str
 
+# Static recommendations used when the LLM answer is unusable or unavailable
+FALLBACK_COLOR_RECOMMENDATIONS = {
+    "recommendations": [
+        {
+            "hex": "#E8D5FF",
+            "name": "Lavender",
+            "reason": "Complementary to warm tones",
+            "use_case": "Accent color in designs",
+            "psychology": "Creativity and elegance"
+        },
+        {
+            "hex": "#FFE5D0",
+            "name": "Peach",
+            "reason": "Soft and versatile",
+            "use_case": "Primary or secondary color",
+            "psychology": "Warmth and comfort"
+        }
+    ],
+    "summary": "These colors create a balanced and fashionable palette suitable for various design styles."
+}
+
 # Helper functions
 def get_color_name(rgb):
     """Convert RGB to color name"""
@@ -128,20 +147,18 @@ def detect_pattern(image_array):
     except:
         return "Unknown", 0
 
-def get_llm_color_recommendations(dominant_colors, pattern_type):
-    """Get LLM-powered recommendations based on colors and patterns"""
-    try:
-        # Prepare color information for LLM
-        color_descriptions = []
-        for i, color in enumerate(dominant_colors[:5]):
-            color_descriptions.append(
-                f"{i+1}. {color['name']} ({color['hex']}) - {color['percentage']}% - {color['psychology']}"
-            )
-        
-        color_text = "\n".join(color_descriptions)
-        
-        # Create LLM prompt
-        prompt = f"""You are an expert fashion color consultant and stylist. Analyze these dominant colors from an image and recommend complementary colors for fashion design.
+def build_color_prompt(dominant_colors, pattern_type):
+    """Prompt asking for complementary colors as JSON"""
+    # Prepare color information for LLM
+    color_descriptions = []
+    for i, color in enumerate(dominant_colors[:5]):
+        color_descriptions.append(
+            f"{i+1}. {color['name']} ({color['hex']}) - {color['percentage']}% - {color['psychology']}"
+        )
+    
+    color_text = "\n".join(color_descriptions)
+    
+    return f"""You are an expert fashion color consultant and stylist. Analyze these dominant colors from an image and recommend complementary colors for fashion design.
 
 IMAGE COLORS DETECTED:
 {color_text}
@@ -173,54 +190,35 @@ Format your response as JSON with this structure:
 
 Be specific with hex codes and fashion design insights."""
 
+async def get_llm_color_recommendations(dominant_colors, pattern_type):
+    """Get LLM-powered recommendations based on colors and patterns"""
+    try:
         # Call Groq LLM
-        message = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        response_text = await chat_completion(
+            [
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": build_color_prompt(dominant_colors, pattern_type)
                 }
             ],
+            task="color_recommendations",
             temperature=0.7,
             max_tokens=1500,
         )
-        
-        # Extract response
-        response_text = message.choices[0].message.content
 
-        
-        # Parse JSON from response
-        try:
-            # Find JSON in response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
+        # Parse element by element so one malformed entry doesn't lose the rest
+        parser = StreamingJSONParser("recommendations")
+        parser.feed(response_text)
+        result = parser.result()
+        if result["recommendations"]:
+            return result
         
         # Fallback if JSON parsing fails
-        return {
-            "recommendations": [
-                {
-                    "hex": "#E8D5FF",
-                    "name": "Lavender",
-                    "reason": "Complementary to warm tones",
-                    "use_case": "Accent color in designs",
-                    "psychology": "Creativity and elegance"
-                },
-                {
-                    "hex": "#FFE5D0",
-                    "name": "Peach",
-                    "reason": "Soft and versatile",
-                    "use_case": "Primary or secondary color",
-                    "psychology": "Warmth and comfort"
-                }
-            ],
-            "summary": "These colors create a balanced and fashionable palette suitable for various design styles."
-        }
+        return FALLBACK_COLOR_RECOMMENDATIONS
+    
+    except CircuitOpenError:
+        # LLM provider is unhealthy - answer immediately with the static palette
+        return FALLBACK_COLOR_RECOMMENDATIONS
     
     except Exception as e:
         print(f"Error getting LLM recommendations: {str(e)}")
@@ -229,48 +227,90 @@ Be specific with hex codes and fashion design insights."""
             "summary": f"Error: {str(e)}"
         }
 
+async def stream_llm_color_recommendations(dominant_colors, pattern_type):
+    """Stream recommendations as the LLM writes them.
+
+    Yields {"recommendation": {...}} as soon as each element of the
+    `recommendations` array closes, then one {"summary": ..., "fallback": bool}.
+    Elements already received are kept if the answer is cut off; the static
+    palette is used only when nothing valid arrived.
+    """
+    parser = StreamingJSONParser("recommendations")
+    try:
+        async for event in stream_chat_completion(
+            [{"role": "user", "content": build_color_prompt(dominant_colors, pattern_type)}],
+            task="color_recommendations",
+            temperature=0.7,
+            max_tokens=1500,
+        ):
+            if event.get("done"):
+                break
+            for rec in parser.feed(event["delta"]):
+                if isinstance(rec, dict):
+                    yield {"recommendation": rec}
+    except Exception as e:
+        # CircuitOpenError or a dropped stream: keep whatever already arrived
+        print(f"Error streaming LLM recommendations: {str(e)}")
+
+    if not parser.items:
+        for rec in FALLBACK_COLOR_RECOMMENDATIONS["recommendations"]:
+            yield {"recommendation": rec}
+        yield {"summary": FALLBACK_COLOR_RECOMMENDATIONS["summary"], "fallback": True}
+        return
+
+    yield {"summary": parser.fields.get("summary", "Color analysis complete"), "fallback": False}
+
+def format_recommendation(rec):
+    return RecommendationInfo(
+        color_hex=rec.get("hex", "#000000"),
+        color_name=rec.get("name", "Color"),
+        reason=rec.get("reason", ""),
+        use_case=rec.get("use_case", ""),
+        psychology=rec.get("psychology", "")
+    )
+
+async def analyze_uploaded_image(file: UploadFile):
+    """Dominant colors and pattern info for an uploaded image"""
+    # Read image
+    contents = await file.read()
+    image = Image.open(BytesIO(contents))
+    img_array = np.array(image)
+    
+    # Convert to OpenCV format (BGR)
+    if len(img_array.shape) == 3 and img_array.shape[2] == 3:
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+    
+    # Extract dominant colors
+    dominant_colors = extract_colors_from_image(img_array)
+    
+    if not dominant_colors:
+        raise HTTPException(status_code=400, detail="Could not extract colors from image")
+    
+    # Detect pattern
+    pattern_type, confidence = detect_pattern(img_array)
+    
+    pattern_info = PatternInfo(
+        type=pattern_type,
+        confidence=round(min(100, confidence), 1),
+        description=f"Pattern complexity: {pattern_type}"
+    )
+    return dominant_colors, pattern_info
+
 # API Endpoints
 @router.post("/analyze")
 async def analyze_color_llm(file: UploadFile = File(...)):
     """Analyze colors and patterns from image using LLM-powered recommendations"""
     try:
-        # Read image
-        contents = await file.read()
-        image = Image.open(BytesIO(contents))
-        img_array = np.array(image)
-        
-        # Convert to OpenCV format (BGR)
-        if len(img_array.shape) == 3 and img_array.shape[2] == 3:
-            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-        
-        # Extract dominant colors
-        dominant_colors = extract_colors_from_image(img_array)
-        
-        if not dominant_colors:
-            raise HTTPException(status_code=400, detail="Could not extract colors from image")
-        
-        # Detect pattern
-        pattern_type, confidence = detect_pattern(img_array)
-        
-        pattern_info = PatternInfo(
-            type=pattern_type,
-            confidence=round(min(100, confidence), 1),
-            description=f"Pattern complexity: {pattern_type}"
-        )
+        dominant_colors, pattern_info = await analyze_uploaded_image(file)
+        pattern_type = pattern_info.type
         
         # Get LLM recommendations
-        llm_result = get_llm_color_recommendations(dominant_colors, pattern_type)
+        llm_result = await get_llm_color_recommendations(dominant_colors, pattern_type)
         
         # Format recommendations
         recommendations = []
         for rec in llm_result.get("recommendations", []):
-            recommendations.append(RecommendationInfo(
-                color_hex=rec.get("hex", "#000000"),
-                color_name=rec.get("name", "Color"),
-                reason=rec.get("reason", ""),
-                use_case=rec.get("use_case", ""),
-                psychology=rec.get("psychology", "")
-            ))
+            recommendations.append(format_recommendation(rec))
         
         # Format dominant colors with psychology
         dominant_colors_with_psychology = []
@@ -294,6 +334,43 @@ async def analyze_color_llm(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error analyzing image: {str(e)}")
 
+@router.post("/analyze/stream")
+async def analyze_color_llm_stream(file: UploadFile = File(...)):
+    """Streaming analysis: image analysis first, then each LLM recommendation as it completes (SSE)"""
+    try:
+        dominant_colors, pattern_info = await analyze_uploaded_image(file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error analyzing image: {str(e)}")
+    
+    async def event_stream():
+        yield sse_event({
+            "dominant_colors": [
+                ColorInfo(**{k: color[k] for k in ("hex", "rgb", "name", "percentage", "psychology")}).model_dump()
+                for color in dominant_colors[:5]
+            ],
+            "pattern_analysis": pattern_info.model_dump()
+        }, event="analysis")
+        
+        count = 0
+        async for item in stream_llm_color_recommendations(dominant_colors, pattern_info.type):
+            if "recommendation" in item:
+                count += 1
+                yield sse_event(format_recommendation(item["recommendation"]).model_dump(), event="recommendation")
+            else:
+                yield sse_event({
+                    "llm_analysis_summary": item["summary"],
+                    "recommendation_count": count,
+                    "fallback": item["fallback"]
+                }, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/analyze")
 async def analyze_color_test():
     """Test endpoint"""
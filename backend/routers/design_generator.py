@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Optional
-from groq import Groq
 import os
+import json
 from datetime import datetime
 import base64
 from io import BytesIO
@@ -11,8 +11,9 @@ from PIL import Image
 import requests
 import time
 
+from llm_gateway import chat_completion
+
 router = APIRouter()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 huggingface_token = os.getenv("HUGGINGFACE_API_KEY")
 serpapi_key = os.getenv("SERPAPI_API_KEY")
 
@@ -30,6 +31,11 @@ class ImageGenerationRequest(BaseModel):
     prompt: str
     use_refiner: Optional[bool] = True
 
+class DesignPackage(BaseModel):
+    """Structured output of the combined summary + image prompt call"""
+    summary: str = Field(min_length=80)
+    image_prompt: str = Field(min_length=40)
+
 # ======================== SERPAPI PINTEREST IMAGE SCRAPING ========================
 
 async def scrape_pinterest_with_serpapi(keywords: List[str], gender: str) -> List[Dict]:
@@ -182,32 +188,78 @@ def create_inspiration_collage(images: List[Dict]) -> Optional[str]:
 
 # ======================== DESIGN SUMMARY & PROMPT ========================
 
+def design_brief(req: DesignGeneratorRequest) -> str:
+    """Design inputs shared by the summary prompts"""
+    keywords_str = ", ".join(req.style_keywords) if req.style_keywords else "elegant, modern"
+    return f"""Design: {req.outfit_type} ({req.gender})
+Occasion: {req.occasion}
+Colors: {', '.join(req.colors)}
+Fabric: {req.fabric_preference or 'Not specified'}
+Region: {req.regional_preference or 'Any'}
+Keywords: {keywords_str}"""
+
+async def generate_design_package(req: DesignGeneratorRequest) -> Optional[DesignPackage]:
+    """Design summary and SDXL prompt in one structured LLM call.
+
+    Returns None if the call fails or the answer doesn't match the
+    DesignPackage schema, so the caller can fall back to the two-step path.
+    """
+    try:
+        gender_context = "men's" if req.gender == "Male" else "women's"
+        
+        prompt = f"""Create a professional fashion design summary for a {gender_context} {req.outfit_type} for {req.occasion}, and an SDXL image prompt for it:
+
+{design_brief(req)}
+
+"summary": design overview, color placement, embellishments, fit, styling. Professional and detailed.
+"image_prompt": detailed SDXL prompt covering model, outfit details, colors, fabric, styling, professional photography. Max 250 words. Single paragraph. Optimize for image generation.
+
+Return ONLY valid JSON, no other text:
+{{"summary": "...", "image_prompt": "..."}}"""
+
+        response = await chat_completion(
+            [{"role": "user", "content": prompt}],
+            task="design_package",
+            temperature=0.7,
+            max_tokens=1100
+        )
+        
+        start_idx = response.find('{')
+        end_idx = response.rfind('}') + 1
+        if start_idx == -1 or end_idx <= start_idx:
+            print("⚠️ Structured design response had no JSON object")
+            return None
+        
+        # strict=False: multi-paragraph summaries often carry raw newlines inside the string
+        package = DesignPackage(**json.loads(response[start_idx:end_idx], strict=False))
+        package.summary = package.summary.strip()
+        package.image_prompt = package.image_prompt.strip()
+        return package
+    except (json.JSONDecodeError, ValidationError, TypeError) as e:
+        print(f"⚠️ Structured design response failed validation: {str(e)[:80]}")
+        return None
+    except Exception as e:
+        print(f"⚠️ Structured design call failed: {str(e)[:80]}")
+        return None
+
 async def generate_design_summary(req: DesignGeneratorRequest) -> str:
     """Generate design summary"""
     try:
-        keywords_str = ", ".join(req.style_keywords) if req.style_keywords else "elegant, modern"
         gender_context = "men's" if req.gender == "Male" else "women's"
         
         prompt = f"""Create a professional fashion design summary for a {gender_context} {req.outfit_type} for {req.occasion}:
 
-Design: {req.outfit_type} ({req.gender})
-Occasion: {req.occasion}
-Colors: {', '.join(req.colors)}
-Fabric: {req.fabric_preference or 'Not specified'}
-Region: {req.regional_preference or 'Any'}
-Keywords: {keywords_str}
+{design_brief(req)}
 
 Include: design overview, color placement, embellishments, fit, styling.
 Professional and detailed."""
 
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+        return await chat_completion(
+            [{"role": "user", "content": prompt}],
+            task="design_summary",
             temperature=0.7,
             max_tokens=600
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         return f"Beautiful {req.gender} {req.outfit_type} for {req.occasion}."
 
@@ -223,14 +275,14 @@ async def generate_image_prompt_from_summary(req: DesignGeneratorRequest, summar
 Include: model, outfit details, colors, fabric, styling, professional photography.
 Max 250 words. Single paragraph. Optimize for image generation."""
 
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt_generation}],
+        response = await chat_completion(
+            [{"role": "user", "content": prompt_generation}],
+            task="image_prompt",
             temperature=0.8,
             max_tokens=500
         )
         
-        return response.choices[0].message.content.strip()
+        return response.strip()
     except Exception as e:
         return f"Professional {gender_context} fashion photography of {req.outfit_type}."
 
@@ -351,13 +403,17 @@ async def generate_prompt_endpoint(req: DesignGeneratorRequest):
             collage = create_inspiration_collage(pinterest_designs)
             print()
         
-        print("=== Step 3: Generating Design Summary ===")
-        design_summary = await generate_design_summary(req)
-        print(f"✅ Summary generated\n")
-        
-        print("=== Step 4: Generating Image Prompt ===")
-        image_prompt = await generate_image_prompt_from_summary(req, design_summary)
-        print(f"✅ Prompt generated\n")
+        print("=== Step 3: Generating Design Summary & Image Prompt ===")
+        package = await generate_design_package(req)
+        if package:
+            design_summary, image_prompt = package.summary, package.image_prompt
+            print(f"✅ Summary and prompt generated\n")
+        else:
+            # Two-step fallback: summary first, then a prompt built from it
+            design_summary = await generate_design_summary(req)
+            print(f"✅ Summary generated\n")
+            image_prompt = await generate_image_prompt_from_summary(req, design_summary)
+            print(f"✅ Prompt generated\n")
         
         fabrics = get_fabric_recommendations(req.fabric_preference, req.occasion, req.gender)
         
@@ -1,36 +1,48 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from groq import Groq
-import os
+from fabric_matrix import FabricMatrix, build_fabric_prompt
+from llm_gateway import CircuitOpenError, chat_completion
 
 router = APIRouter()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+# Precomputed garment x season answers, loaded once at startup
+fabric_matrix = FabricMatrix.load()
 
 class FabricRequest(BaseModel):
     garment_type: str
     season: str
     preferences: str = ""
 
+@router.get("/matrix")
+async def fabric_matrix_info():
+    """Coverage and version of the precomputed fabric matrix"""
+    return {"success": True, **fabric_matrix.stats()}
+
 @router.post("/recommend")
 async def recommend_fabrics(req: FabricRequest):
-    """Recommend fabrics using Groq AI (Llama 3.3 70B)"""
+    """Recommend fabrics from the precomputed matrix, or Groq AI (Llama 3.3 70B) for custom preferences"""
     try:
-        prompt = f"""As a fabric expert, recommend the best fabrics for:
-Garment Type: {req.garment_type}
-Season: {req.season}
-Additional Preferences: {req.preferences}
-
-Provide:
-1. Top 3 fabric recommendations
-2. Pros and cons for each
-3. Care instructions
-4. Price range
+        if not req.preferences.strip():
+            precomputed = fabric_matrix.get(req.garment_type, req.season)
+            if precomputed:
+                return {
+                    "success": True,
+                    "garment_type": req.garment_type,
+                    "season": req.season,
+                    "recommendations": precomputed,
+                    "source": "precomputed",
+                    "precomputed": True,
+                    "matrix_version": fabric_matrix.metadata.get("version"),
+                    "generated_at": fabric_matrix.metadata.get("generated_at"),
+                    # The model that built the matrix, not one called for this request
+                    "model": fabric_matrix.metadata.get("model")
+                }
 
-Be specific and practical."""
+        prompt = build_fabric_prompt(req.garment_type, req.season, req.preferences)
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # ✅ UPDATED
-            messages=[{"role": "user", "content": prompt}],
+        response = await chat_completion(
+            [{"role": "user", "content": prompt}],
+            task="fabric_advice",
             temperature=0.6,
             max_tokens=800
         )
@@ -39,9 +51,13 @@ Be specific and practical."""
             "success": True,
             "garment_type": req.garment_type,
             "season": req.season,
-            "recommendations": response.choices[0].message.content,
+            "recommendations": response,
+            "source": "llm",
+            "precomputed": False,
             "model": "Llama 3.3 70B (Groq)"
         }
         
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from groq import Groq
 import os
 import cv2
 import numpy as np
@@ -27,10 +26,18 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 
+from fallback_reasoning import FallbackReasoning
+from llm_gateway import chat_completion
+
 router = APIRouter()
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 serpapi_key = os.getenv("SERPAPI_API_KEY")
 
+# Pre-generated reasoning for FallbackDatabase fabrics (see fallback_reasoning.py)
+fallback_reasoning = FallbackReasoning.load()
+
+# Max parallel per-fabric LLM calls when batched reasoning can't be parsed
+REASONING_FALLBACK_CONCURRENCY = 5
+
 # ======================== PYDANTIC MODELS ========================
 
 class FabricRecommendationRequest(BaseModel):
@@ -44,6 +51,7 @@ class FabricRecommendationRequest(BaseModel):
     occasion: str = "casual"
     sustainability: bool = False
     garment_type: str = "shirt"
+    batch_reasoning: bool = True
 
 class ExportPDFRequest(BaseModel):
     recommendations: List[Dict]
@@ -452,6 +460,11 @@ class FallbackDatabase:
 class FabricMatcher:
     """AI-powered fabric matching"""
     
+    @staticmethod
+    def template_reasoning(fabric_data: Dict) -> str:
+        """Generic reasoning used when nothing better is available"""
+        return f"This {fabric_data.get('fabric_name')} from {fabric_data.get('supplier')} offers excellent quality at ₹{fabric_data.get('price_per_meter')}/m."
+    
     @staticmethod
     async def generate_fabric_reasoning(fabric_data: Dict, image_analysis: Dict, user_preferences: Dict) -> str:
         """Generate AI reasoning for fabric"""
@@ -471,17 +484,88 @@ class FabricMatcher:
 
 Provide 2-3 sentences explaining why this fabric is perfect."""
 
-            response = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+            response = await chat_completion(
+                [{"role": "user", "content": prompt}],
+                task="fabric_reasoning",
                 temperature=0.6,
                 max_tokens=180
             )
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
+        
+        except Exception as e:
+            return FabricMatcher.template_reasoning(fabric_data)
+    
+    @staticmethod
+    async def generate_batch_reasoning(fabrics: List[Dict], image_analysis: Dict, user_preferences: Dict) -> List[str]:
+        """Generate reasoning for all candidate fabrics in one LLM call.
+
+        Candidates are numbered and the model answers with a JSON array keyed
+        by candidate id. Any candidate missing from a malformed or truncated
+        answer falls back to bounded-concurrency per-fabric calls.
+        """
+        if not fabrics:
+            return []
+        
+        reasoning_by_id = {}
+        try:
+            colors = image_analysis.get("dominant_colors", [])
+            texture = image_analysis.get("texture_analysis", {})
+            color_names = ", ".join([c["name"] for c in colors[:3]])
+            
+            candidates = "\n".join([
+                f"{i}. {f.get('fabric_name')} | ₹{f.get('price_per_meter')}/m | {f.get('supplier')} | {f.get('material')} | {f.get('platform', 'Unknown')}"
+                for i, f in enumerate(fabrics)
+            ])
+            
+            prompt = f"""As a professional fabric consultant, analyze these fabric recommendations:
+
+**Design:** {color_names} | Texture: {texture.get('texture_type', 'Unknown')}
+**User:** {user_preferences.get('style_preference')} style | {user_preferences.get('season')} season | {user_preferences.get('occasion')} occasion
+
+**Candidates (id. name | price | supplier | material | platform):**
+{candidates}
+
+For EVERY candidate, write 2-3 sentences explaining why this fabric is perfect.
+Return ONLY a JSON array, no other text:
+[{{"id": 0, "reasoning": "..."}}, {{"id": 1, "reasoning": "..."}}]"""
+
+            response = await chat_completion(
+                [{"role": "user", "content": prompt}],
+                task="fabric_reasoning_batch",
+                temperature=0.6,
+                max_tokens=min(4000, 150 * len(fabrics) + 200)
+            )
+            
+            start_idx = response.find('[')
+            end_idx = response.rfind(']') + 1
+            if start_idx != -1 and end_idx > start_idx:
+                for item in json.loads(response[start_idx:end_idx]):
+                    try:
+                        item_id = int(item.get("id"))
+                    except (TypeError, ValueError, AttributeError):
+                        continue
+                    reasoning = str(item.get("reasoning", "")).strip()
+                    if 0 <= item_id < len(fabrics) and reasoning:
+                        reasoning_by_id[item_id] = reasoning
         
         except Exception as e:
-            return f"This {fabric_data.get('fabric_name')} from {fabric_data.get('supplier')} offers excellent quality at ₹{fabric_data.get('price_per_meter')}/m."
+            print(f"⚠️ Batched reasoning failed, falling back to per-fabric calls: {str(e)[:80]}")
+        
+        missing = [i for i in range(len(fabrics)) if i not in reasoning_by_id]
+        if missing:
+            print(f"🔁 Generating reasoning individually for {len(missing)} fabrics")
+            semaphore = asyncio.Semaphore(REASONING_FALLBACK_CONCURRENCY)
+            
+            async def reason_one(i: int):
+                async with semaphore:
+                    reasoning_by_id[i] = await FabricMatcher.generate_fabric_reasoning(
+                        fabrics[i], image_analysis, user_preferences
+                    )
+            
+            await asyncio.gather(*[reason_one(i) for i in missing])
+        
+        return [reasoning_by_id[i] for i in range(len(fabrics))]
     
     @staticmethod
     async def generate_summary_report(recommendations: List[Dict], image_analysis: Dict, user_preferences: Dict) -> str:
@@ -503,17 +587,48 @@ Provide 2-3 sentences explaining why this fabric is perfect."""
 
 Write 4-5 sentences covering: compatibility, recommendations, quality, platforms, and value."""
 
-            response = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+            response = await chat_completion(
+                [{"role": "user", "content": prompt}],
+                task="fabric_summary",
                 temperature=0.7,
                 max_tokens=300
             )
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
         
         except Exception as e:
             return "Our curated fabric recommendations combine real-time e-commerce data with AI-powered matching. All options have been selected for quality, price, and compatibility with your design requirements."
+    
+    @staticmethod
+    def pregenerated_reasoning(fabrics: List[Dict], user_preferences: Dict) -> List[str]:
+        """Reasoning for fallback catalog fabrics from the pre-generated lookup (no LLM calls)"""
+        return [
+            fallback_reasoning.get(
+                fabric.get("fabric_name"),
+                user_preferences.get("style_preference", ""),
+                user_preferences.get("season", ""),
+                user_preferences.get("occasion", ""),
+            ) or FabricMatcher.template_reasoning(fabric)
+            for fabric in fabrics
+        ]
+    
+    @staticmethod
+    def fallback_summary(recommendations: List[Dict], user_preferences: Dict) -> str:
+        """Templated summary for the fallback catalog (no LLM calls)"""
+        if not recommendations:
+            return "No catalog fabrics matched your budget. Try widening the price range or adding fabric preferences."
+        
+        prices = [r.get("price_per_meter", 0) for r in recommendations]
+        top_picks = ", ".join([r.get("fabric_name", "") for r in recommendations[:3]])
+        fabric_types = sorted(set([r.get("fabric_type", "") for r in recommendations]))
+        
+        return (
+            f"Live marketplace results are unavailable right now, so these picks come from our curated fabric catalog. "
+            f"For a {user_preferences.get('style_preference')} look in {user_preferences.get('season')} "
+            f"for a {user_preferences.get('occasion')} occasion, the top picks are {top_picks}. "
+            f"The selection covers {', '.join(fabric_types)} between ₹{min(prices)} and ₹{max(prices)} per meter, "
+            f"all from trusted suppliers."
+        )
 
 # ======================== PDF EXPORT MODULE ========================
 
@@ -684,7 +799,8 @@ async def get_fabric_recommendations(req: FabricRecommendationRequest):
         fabric_data = await SerpAPIFabricScraper.get_all_fabrics_serpapi(keywords, req.budget_min, req.budget_max)
         
         # Fallback to local database if no results
-        if not fabric_data:
+        used_fallback = not fabric_data
+        if used_fallback:
             print("⚠️ SerpAPI returned no results. Using fallback database...\n")
             fabric_data = FallbackDatabase.get_fallback_fabrics(keywords, req.budget_min, req.budget_max)
         
@@ -700,17 +816,37 @@ async def get_fabric_recommendations(req: FabricRecommendationRequest):
             "budget_max": req.budget_max,
         }
         
-        for fabric in fabric_data[:25]:
-            try:
-                reasoning = await FabricMatcher.generate_fabric_reasoning(fabric, image_analysis, user_prefs)
+        candidates = fabric_data[:25]
+        
+        if used_fallback and fallback_reasoning.available:
+            # Static catalog: serve pre-generated reasoning, no LLM calls
+            for fabric, reasoning in zip(candidates, FabricMatcher.pregenerated_reasoning(candidates, user_prefs)):
                 fabric["ai_reasoning"] = reasoning
                 fabric["compatibility_score"] = round(np.random.uniform(0.78, 0.99), 2)
                 recommendations.append(fabric)
-            except:
+            ai_summary = FabricMatcher.fallback_summary(recommendations, user_prefs)
+        elif req.batch_reasoning:
+            # One batched reasoning call, run alongside the summary (which only needs names/platforms)
+            reasonings, ai_summary = await asyncio.gather(
+                FabricMatcher.generate_batch_reasoning(candidates, image_analysis, user_prefs),
+                FabricMatcher.generate_summary_report(candidates, image_analysis, user_prefs)
+            )
+            for fabric, reasoning in zip(candidates, reasonings):
+                fabric["ai_reasoning"] = reasoning
+                fabric["compatibility_score"] = round(np.random.uniform(0.78, 0.99), 2)
                 recommendations.append(fabric)
-        
-        # Generate summary
-        ai_summary = await FabricMatcher.generate_summary_report(recommendations, image_analysis, user_prefs)
+        else:
+            for fabric in candidates:
+                try:
+                    reasoning = await FabricMatcher.generate_fabric_reasoning(fabric, image_analysis, user_prefs)
+                    fabric["ai_reasoning"] = reasoning
+                    fabric["compatibility_score"] = round(np.random.uniform(0.78, 0.99), 2)
+                    recommendations.append(fabric)
+                except:
+                    recommendations.append(fabric)
+            
+            # Generate summary
+            ai_summary = await FabricMatcher.generate_summary_report(recommendations, image_analysis, user_prefs)
         
         return {
             "success": True,
@@ -719,7 +855,7 @@ async def get_fabric_recommendations(req: FabricRecommendationRequest):
             "ai_summary": ai_summary,
             "total_count": len(recommendations),
             "timestamp": datetime.now().isoformat(),
-            "data_source": "serpapi-powered",
+            "data_source": "fallback-database" if used_fallback else "serpapi-powered",
             "search_engines_used": ["Google Shopping", "Amazon", "Flipkart", "AJIO", "Myntra", "Fabriclore"]
         }
     
@@ -766,6 +902,7 @@ async def get_status():
             "✅ Intelligent Fallbacks"
         ],
         "serpapi_configured": bool(serpapi_key),
+        "fallback_reasoning": fallback_reasoning.stats(),
         "groq_configured": bool(os.getenv("GROQ_API_KEY")),
         "search_engines": [
             "Google Shopping",
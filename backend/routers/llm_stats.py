@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from llm_cache import llm_cache
+from llm_gateway import gateway
+from llm_telemetry import llm_telemetry
+from semantic_cache import stylist_answer_cache
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_llm_stats():
+    """Per call-site LLM latency, token and outcome summary, heaviest first"""
+    return {
+        "success": True,
+        **llm_telemetry.summary(),
+        "gateway": gateway.stats(),
+        "cache": llm_cache.stats(),
+        "stylist_semantic_cache": stylist_answer_cache.stats(),
+    }
+
+
+@router.post("/stats/reset")
+async def reset_llm_stats():
+    """Start a fresh measurement window (e.g. before a load test)"""
+    llm_telemetry.reset()
+    return {"success": True, "message": "LLM telemetry reset"}
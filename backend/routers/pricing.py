@@ -1,10 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from groq import Groq
-import os
+from llm_gateway import CircuitOpenError, chat_completion
 
 router = APIRouter()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 class PricingRequest(BaseModel):
     product_name: str
@@ -31,9 +29,9 @@ Provide:
 5. Pricing justification
 6. Market positioning"""
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # ✅ UPDATED
-            messages=[{"role": "user", "content": prompt}],
+        response = await chat_completion(
+            [{"role": "user", "content": prompt}],
+            task="pricing_strategy",
             temperature=0.6,
             max_tokens=700
         )
@@ -42,9 +40,11 @@ Provide:
             "success": True,
             "product": req.product_name,
             "cost": req.cost,
-            "strategy": response.choices[0].message.content,
+            "strategy": response,
             "model": "Llama 3.3 70B (Groq)"
         }
         
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
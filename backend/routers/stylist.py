@@ -1,20 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from groq import Groq
-import os
+from typing import Optional
+from config import settings
+from llm_gateway import CircuitOpenError, chat_completion, stream_chat_completion
+from semantic_cache import stylist_answer_cache
+from sse import sse_event
+from .stylist_sessions import session_store
 
 router = APIRouter()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
-class ChatRequest(BaseModel):
-    message: str
-    history: list = []
-
-@router.post("/chat")
-async def stylist_chat(req: ChatRequest):
-    """Personal AI Stylist using Groq AI (Llama 3.3 70B)"""
-    try:
-        system_prompt = """You are VastraVaani AI Stylist, an expert fashion consultant with deep knowledge of:
+SYSTEM_PROMPT = """You are VastraVaani AI Stylist, an expert fashion consultant with deep knowledge of:
 - Fashion history and evolution
 - Current global trends
 - Styling techniques
@@ -27,28 +23,125 @@ async def stylist_chat(req: ChatRequest):
 
 Provide practical, specific, and personalized fashion advice."""
 
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history
-        for msg in req.history[-5:]:
-            messages.append({"role": "user", "content": msg.get("user", "")})
-            messages.append({"role": "assistant", "content": msg.get("assistant", "")})
-        
-        messages.append({"role": "user", "content": req.message})
-        
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # ✅ UPDATED
-            messages=messages,
-            temperature=0.7,
-            max_tokens=800
-        )
-        
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    # Only used to seed a new session; existing sessions keep history server-side
+    history: list = []
+
+def build_messages(session, message: str) -> list:
+    """System prompt + session summary and recent turns + the new message"""
+    messages = session.build_context(SYSTEM_PROMPT)
+    messages.append({"role": "user", "content": message})
+    return messages
+
+def semantic_cache_applies(session) -> bool:
+    """Only opening questions are answered from / stored in the semantic cache,
+    since later answers depend on the conversation so far"""
+    return settings.STYLIST_SEMANTIC_CACHE_ENABLED and not session.has_context
+
+@router.post("/chat")
+async def stylist_chat(req: ChatRequest):
+    """Personal AI Stylist using Groq AI (Llama 3.3 70B)"""
+    try:
+        session = session_store.get_or_create(req.session_id, req.history)
+        use_semantic_cache = semantic_cache_applies(session)
+        cached = stylist_answer_cache.lookup(req.message) if use_semantic_cache else None
+
+        if cached:
+            response = cached["answer"]
+            model = cached["model"]
+        else:
+            details = {}
+            response = await chat_completion(
+                build_messages(session, req.message),
+                task="stylist_chat",
+                temperature=0.7,
+                max_tokens=800,
+                details=details
+            )
+            model = details.get("model")
+            if use_semantic_cache:
+                stylist_answer_cache.add(req.message, response, model)
+        session_store.record_turn(session, req.message, response)
+
         return {
             "success": True,
+            "session_id": session.session_id,
             "message": req.message,
-            "response": response.choices[0].message.content,
-            "model": "Llama 3.3 70B (Groq)"
+            "response": response,
+            "cached": cached is not None,
+            "model": model
         }
-        
+
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/stream")
+async def stylist_chat_stream(req: ChatRequest):
+    """Streaming AI Stylist: tokens as Server-Sent Events, then a final `done` event with usage"""
+
+    session = session_store.get_or_create(req.session_id, req.history)
+    messages = build_messages(session, req.message)
+    use_semantic_cache = semantic_cache_applies(session)
+    cached = stylist_answer_cache.lookup(req.message) if use_semantic_cache else None
+
+    async def event_stream():
+        if cached:
+            session_store.record_turn(session, req.message, cached["answer"])
+            yield sse_event({"token": cached["answer"]})
+            yield sse_event({
+                "session_id": session.session_id,
+                "usage": None,
+                "cached": True,
+                "model": cached["model"]
+            }, event="done")
+            return
+
+        parts = []
+        try:
+            async for event in stream_chat_completion(
+                messages,
+                task="stylist_chat",
+                temperature=0.7,
+                max_tokens=800
+            ):
+                if event.get("done"):
+                    response = "".join(parts)
+                    if use_semantic_cache:
+                        stylist_answer_cache.add(req.message, response, event["model"])
+                    session_store.record_turn(session, req.message, response)
+                    yield sse_event({
+                        "session_id": session.session_id,
+                        "usage": event["usage"],
+                        "cached": event["cached"],
+                        "model": event["model"]
+                    }, event="done")
+                else:
+                    parts.append(event["delta"])
+                    yield sse_event({"token": event["delta"]})
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/session/{session_id}")
+async def get_stylist_session(session_id: str):
+    """Inspect a stylist session (summary + recent turns)"""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True, "session": session.to_dict()}
+
+@router.delete("/session/{session_id}")
+async def delete_stylist_session(session_id: str):
+    """Forget a stylist session"""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True, "message": "Session deleted"}
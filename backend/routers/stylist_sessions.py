@@ -0,0 +1,183 @@
+"""
+Server-side stylist chat sessions.
+
+Each session keeps its most recent turns verbatim plus a compact rolling
+summary of everything older. When turns fall out of the recent window they
+are folded into the summary by a background LLM call, so clients only send
+the new message and prompt size stays flat on long styling sessions.
+
+Requests without a session_id get a throwaway session seeded from the
+history they send: it is answered from but never stored or summarized.
+The session_id in the response starts a stored session on the next turn.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from llm_gateway import chat_completion
+
+RECENT_TURNS = 4            # turns sent verbatim with every prompt
+MAX_SESSIONS = 1000         # least recently used sessions are dropped beyond this
+SESSION_TTL_SECONDS = 6 * 3600
+SUMMARY_MAX_TOKENS = 250
+MAX_PENDING_TURNS = 20      # oldest unsummarized turns are dropped beyond this (e.g. summaries failing)
+
+
+def seed_turns(history: Optional[list]) -> List[Dict]:
+    """Client history as full turns.
+
+    The web client sends one entry per message, with the other side empty,
+    starting with its canned greeting. Assistant-only entries are joined to
+    the preceding user message, and ones with no user message before them
+    (the greeting) are dropped, so they don't count as conversation.
+    """
+    turns: List[Dict] = []
+    for msg in history or []:
+        user, assistant = msg.get("user") or "", msg.get("assistant") or ""
+        if user:
+            turns.append({"user": user, "assistant": assistant})
+        elif assistant and turns and not turns[-1]["assistant"]:
+            turns[-1]["assistant"] = assistant
+    return turns
+
+
+class StylistSession:
+    def __init__(self, session_id: str, stored: bool = True):
+        self.session_id = session_id
+        self.stored = stored
+        self.summary = ""
+        self.recent: List[Dict] = []      # [{"user": ..., "assistant": ...}]
+        self.pending: List[Dict] = []     # turns waiting to be folded into the summary
+        self.turn_count = 0
+        self.last_active = time.time()
+        self.summarizing = False
+
+    def add_turn(self, user: str, assistant: str):
+        self.recent.append({"user": user, "assistant": assistant})
+        self.turn_count += 1
+        self.last_active = time.time()
+        if len(self.recent) > RECENT_TURNS:
+            overflow = len(self.recent) - RECENT_TURNS
+            self.pending.extend(self.recent[:overflow])
+            self.recent = self.recent[overflow:]
+            if len(self.pending) > MAX_PENDING_TURNS:
+                del self.pending[:len(self.pending) - MAX_PENDING_TURNS]
+
+    @property
+    def has_context(self) -> bool:
+        """False until the session has turns the answer could depend on"""
+        return bool(self.summary or self.pending or self.recent)
+
+    def build_context(self, system_prompt: str) -> List[Dict]:
+        """System prompt, rolling summary, unsummarized and recent turns"""
+        messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation with this client:\n{self.summary}"
+            })
+
+        # Turns still being summarized are sent verbatim so nothing is lost meanwhile
+        for turn in self.pending + self.recent:
+            messages.append({"role": "user", "content": turn["user"]})
+            messages.append({"role": "assistant", "content": turn["assistant"]})
+        return messages
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "summary": self.summary,
+            "recent_turns": self.recent,
+            "pending_turns": len(self.pending),
+            "turn_count": self.turn_count,
+        }
+
+
+class SessionStore:
+    """In-memory session store with LRU and idle-time eviction"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, StylistSession]" = OrderedDict()
+        self._tasks = set()
+
+    def _evict(self):
+        now = time.time()
+        expired = [sid for sid, s in self._sessions.items() if now - s.last_active > self.ttl_seconds]
+        for sid in expired:
+            del self._sessions[sid]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def get_or_create(self, session_id: Optional[str], history: Optional[list] = None) -> StylistSession:
+        """Return the session, creating (and seeding from legacy history) if unknown.
+
+        Without a session_id the seeded session is not stored.
+        """
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            session = StylistSession(session_id or uuid.uuid4().hex, stored=bool(session_id))
+            for turn in seed_turns(history)[-RECENT_TURNS:]:
+                session.add_turn(turn["user"], turn["assistant"])
+            if not session.stored:
+                return session
+            self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        self._evict()
+        return session
+
+    def get(self, session_id: str) -> Optional[StylistSession]:
+        return self._sessions.get(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def record_turn(self, session: StylistSession, user: str, assistant: str):
+        """Append a turn and refresh the summary in the background if needed"""
+        session.add_turn(user, assistant)
+        if session.stored and session.pending and not session.summarizing:
+            # Set before the task runs so a second turn can't start another summarizer
+            session.summarizing = True
+            task = asyncio.create_task(self._refresh_summary(session))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refresh_summary(self, session: StylistSession):
+        try:
+            while session.pending:
+                batch = list(session.pending)
+                transcript = "\n".join(
+                    f"Client: {t['user']}\nStylist: {t['assistant']}" for t in batch
+                )
+                prompt = f"""Update the running summary of a fashion styling conversation.
+
+Current summary:
+{session.summary or "(none yet)"}
+
+New turns:
+{transcript}
+
+Rewrite the summary in under 150 words. Keep the client's preferences, body/occasion details,
+budget, colors, decisions made and open questions. Return only the summary."""
+
+                session.summary = (await chat_completion(
+                    [{"role": "user", "content": prompt}],
+                    task="stylist_summary",
+                    temperature=0.3,
+                    max_tokens=SUMMARY_MAX_TOKENS
+                )).strip()
+                # The cap may have dropped some of the batch meanwhile; remove by identity
+                done = {id(turn) for turn in batch}
+                session.pending = [turn for turn in session.pending if id(turn) not in done]
+        except Exception as e:
+            # Keep pending turns verbatim; the next turn retries the summary
+            print(f"⚠️ Stylist session summary failed: {str(e)[:80]}")
+        finally:
+            session.summarizing = False
+
+
+session_store = SessionStore()
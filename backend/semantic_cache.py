@@ -0,0 +1,241 @@
+"""
+Semantic answer cache for stylist questions.
+
+Many stylist messages are paraphrases of the same question ("what to wear
+to a sangeet", "sangeet outfit ideas"), which the exact-match LLM cache never
+matches. Questions are turned into hashed TF-IDF vectors by a small local
+vectorizer (no model download, NumPy only) and kept in an in-memory matrix of
+L2-normalized rows. A lookup is one matrix-vector product; the best match is
+returned when its cosine similarity clears the configured threshold.
+
+Memory is bounded: the matrix is preallocated at max_entries rows, entries
+expire after a TTL, and the least recently used entry is evicted when full.
+Rows keep the IDF weights they were indexed with; document frequencies are
+updated as entries are added and evicted.
+"""
+
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "to", "of", "in", "on", "at", "for",
+    "from", "by", "with", "about", "as", "into", "is", "are", "was", "were", "be",
+    "been", "am", "do", "does", "did", "can", "could", "would", "should", "will",
+    "shall", "may", "might", "must", "i", "me", "my", "mine", "we", "our", "you",
+    "your", "it", "its", "this", "that", "these", "those", "there", "what",
+    "which", "how", "any", "some", "please", "pls", "kindly", "suggest",
+    "suggestion", "suggestions", "idea", "ideas", "tip", "tips", "recommend",
+    "recommendation", "recommendations", "give", "tell", "help", "need", "want",
+    "good", "best", "nice", "option", "options", "also", "so", "just", "really",
+    "very", "get", "go", "going", "hi", "hello", "hey",
+}
+
+# Words that ask the same thing, folded onto one term before hashing
+SYNONYMS = {
+    "wear": "outfit",
+    "wearing": "outfit",
+    "attire": "outfit",
+    "look": "outfit",
+    "clothes": "outfit",
+    "clothing": "outfit",
+    "ensemble": "outfit",
+    "style": "outfit",
+    "styling": "outfit",
+    "colour": "color",
+    "pant": "trouser",
+    "tee": "tshirt",
+    "gent": "men",
+    "man": "men",
+    "male": "men",
+    "woman": "women",
+    "female": "women",
+    "lady": "women",
+    "ladie": "women",
+    "shaadi": "wedding",
+    "marriage": "wedding",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingVectorizer:
+    """Bag of unigrams and bigrams hashed into a fixed number of columns"""
+
+    def __init__(self, n_features: int):
+        self.n_features = n_features
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        tokens = []
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            # Cheap plural folding: outfits -> outfit, dresses -> dress
+            if word.endswith(("sses", "shes", "ches", "xes")):
+                word = word[:-2]
+            elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+                word = word[:-1]
+            tokens.append(SYNONYMS.get(word, word))
+        return tokens
+
+    def term_counts(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(column indices, sublinear term frequencies) of the hashed terms"""
+        tokens = self.tokenize(text)
+        terms = tokens + [" ".join(sorted(pair)) for pair in zip(tokens, tokens[1:])]
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # crc32 is stable across processes, unlike hash()
+        columns = np.fromiter(
+            (zlib.crc32(term.encode("utf-8")) % self.n_features for term in terms),
+            dtype=np.int64,
+            count=len(terms),
+        )
+        indices, counts = np.unique(columns, return_counts=True)
+        return indices, (1.0 + np.log(counts)).astype(np.float32)
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour cache of question/answer pairs"""
+
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: float, n_features: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.vectorizer = HashingVectorizer(n_features)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((max_entries, n_features), dtype=np.float32)
+        self._doc_freq = np.zeros(n_features, dtype=np.float64)
+        self._entries: List[Dict] = []   # row i of the matrix belongs to entry i
+
+    def _idf(self, indices: np.ndarray) -> np.ndarray:
+        docs = len(self._entries)
+        return (np.log((1.0 + docs) / (1.0 + self._doc_freq[indices])) + 1.0).astype(np.float32)
+
+    def _embed(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        indices, tf = self.vectorizer.term_counts(text)
+        if not len(indices):
+            return indices, tf
+        weights = tf * self._idf(indices)
+        return indices, weights / np.linalg.norm(weights)
+
+    def _best_match(self, indices: np.ndarray, weights: np.ndarray) -> Tuple[int, float]:
+        """Row and cosine similarity of the closest stored question"""
+        # Sparse query against dense rows: only the query's columns contribute
+        scores = self._matrix[:len(self._entries), indices] @ weights
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+
+    def _remove(self, row: int):
+        """Drop one entry, moving the last row into its slot"""
+        entry = self._entries[row]
+        self._doc_freq[entry["columns"]] -= 1
+        last = len(self._entries) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._entries[row] = self._entries[last]
+        self._matrix[last] = 0.0
+        self._entries.pop()
+
+    def lookup(self, question: str) -> Optional[Dict]:
+        """Cached answer for a question similar enough to one seen before"""
+        with self._lock:
+            indices, weights = self._embed(question)
+            if not self._entries or not len(indices):
+                self.misses += 1
+                return None
+
+            row, similarity = self._best_match(indices, weights)
+            entry = self._entries[row]
+            now = time.time()
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            if now - entry["created_at"] > self.ttl_seconds:
+                self._remove(row)
+                self.misses += 1
+                return None
+
+            entry["last_access"] = now
+            entry["hits"] += 1
+            self.hits += 1
+            return {
+                "answer": entry["answer"],
+                "question": entry["question"],
+                "model": entry["model"],
+                "similarity": round(similarity, 3),
+            }
+
+    def add(self, question: str, answer: str, model: Optional[str] = None):
+        """Index a question/answer pair (and the model that wrote the answer), replacing a near-duplicate question"""
+        if not answer:
+            return
+        with self._lock:
+            indices, _ = self.vectorizer.term_counts(question)
+            if not len(indices):
+                return
+
+            if self._entries:
+                _, weights = self._embed(question)
+                row, similarity = self._best_match(indices, weights)
+                if similarity >= self.threshold:
+                    self._remove(row)
+
+            if len(self._entries) >= self.max_entries:
+                lru = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_access"])
+                self._remove(lru)
+                self.evictions += 1
+
+            self._doc_freq[indices] += 1
+            _, weights = self._embed(question)
+            row = len(self._entries)
+            self._matrix[row, indices] = weights
+            now = time.time()
+            self._entries.append({
+                "question": question,
+                "answer": answer,
+                "model": model,
+                "columns": indices,
+                "created_at": now,
+                "last_access": now,
+                "hits": 0,
+            })
+
+    def clear(self):
+        with self._lock:
+            self._matrix[:len(self._entries)] = 0.0
+            self._doc_freq[:] = 0.0
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.STYLIST_SEMANTIC_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+stylist_answer_cache = SemanticCache(
+    threshold=settings.STYLIST_SEMANTIC_CACHE_THRESHOLD,
+    max_entries=settings.STYLIST_SEMANTIC_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.STYLIST_SEMANTIC_CACHE_TTL_SECONDS,
+    n_features=settings.STYLIST_SEMANTIC_CACHE_FEATURES,
+)
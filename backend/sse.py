@@ -0,0 +1,12 @@
+"""
+Server-Sent Events formatting shared by the streaming endpoints.
+"""
+
+import json
+from typing import Optional
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
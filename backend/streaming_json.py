@@ -0,0 +1,117 @@
+"""
+Incremental parser for JSON objects streamed by the LLM.
+
+LLM answers like {"recommendations": [{...}, {...}], "summary": "..."}
+arrive token by token, often wrapped in prose or code fences. The parser
+scans each chunk once, tracking nesting and string state, and hands back
+every element of the chosen top-level array as soon as its closing brace
+arrives, so callers can forward it to the client immediately. Each element
+and each other top-level field is decoded on its own, so a malformed
+element or a truncated tail only loses that part of the answer.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class StreamingJSONParser:
+    """Pulls array elements and top-level fields out of a growing JSON text"""
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.items: List[Any] = []
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+
+        self._buf = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[tuple] = None   # (start, end) of the last closed string
+        self._key: Optional[str] = None             # top-level key whose value is being read
+        self._value_start = -1
+        self._in_array = False
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume more text; return the array elements completed by it"""
+        self._buf += chunk
+        new_items = []
+        buf = self._buf
+
+        while self._pos < len(buf) and not self.complete:
+            i = self._pos
+            c = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                # Skip any prose or ```json fence before the object
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = (self._string_start, i + 1)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2 and c == "[" and self._key == self.array_key:
+                    self._in_array = True
+                elif self._in_array and self._depth == 3:
+                    self._item_start = i
+            elif c in "}]":
+                if self._in_array and self._depth == 3 and self._item_start >= 0:
+                    item = self._decode(buf[self._item_start:i + 1])
+                    if item is not None:
+                        self.items.append(item)
+                        new_items.append(item)
+                    self._item_start = -1
+                elif self._in_array and self._depth == 2:
+                    self._in_array = False
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_field(i)
+                    self.complete = True
+            elif self._depth == 1:
+                if c == ":" and self._last_string:
+                    start, end = self._last_string
+                    self._key = self._decode(buf[start:end])
+                    self._value_start = i + 1
+                elif c == ",":
+                    self._finish_field(i)
+
+        return new_items
+
+    def _finish_field(self, end: int):
+        """Decode the top-level value that ends at `end` (array elements are already collected)"""
+        if self._key is not None and self._key != self.array_key and self._value_start >= 0:
+            value = self._decode(self._buf[self._value_start:end])
+            if value is not None:
+                self.fields[self._key] = value
+        self._key = None
+        self._value_start = -1
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    def result(self) -> Dict[str, Any]:
+        """Everything recovered so far, in the shape of the full answer"""
+        return {**self.fields, self.array_key: list(self.items)}
@@ -0,0 +1,34 @@
+import asyncio
+
+from routers import design_generator
+from routers.design_generator import DesignGeneratorRequest, generate_design_package
+
+REQUEST = DesignGeneratorRequest(outfit_type="Lehenga", occasion="Wedding", gender="Female", colors=["maroon", "gold"])
+
+
+SUMMARY = (
+    "A maroon silk lehenga with a flared, panelled skirt and a fitted blouse.\n\n"
+    "Gold zari borders run along the hem and dupatta, with mirror work on the sleeves."
+)
+IMAGE_PROMPT = "Model in a maroon silk lehenga with gold zari borders, studio lighting, full length"
+
+
+def test_summary_with_raw_newlines_is_accepted(monkeypatch):
+    # Literal newlines inside the JSON string, as the model often writes them
+    answer = '```json\n{"summary": "%s", "image_prompt": " %s "}\n```' % (SUMMARY, IMAGE_PROMPT)
+
+    async def fake_completion(messages, **kwargs):
+        return answer
+
+    monkeypatch.setattr(design_generator, "chat_completion", fake_completion)
+    package = asyncio.run(generate_design_package(REQUEST))
+    assert package.summary == SUMMARY
+    assert package.image_prompt == IMAGE_PROMPT
+
+
+def test_answer_without_json_falls_back(monkeypatch):
+    async def fake_completion(messages, **kwargs):
+        return "Sorry, I can't help with that."
+
+    monkeypatch.setattr(design_generator, "chat_completion", fake_completion)
+    assert asyncio.run(generate_design_package(REQUEST)) is None
@@ -0,0 +1,24 @@
+from fabric_matrix import MATRIX_VERSION, FabricMatrix, write_matrix
+
+
+def test_matrix_round_trip_and_aliases(tmp_path):
+    path = str(tmp_path / "matrix.json")
+    write_matrix({
+        "version": MATRIX_VERSION,
+        "model": "test-model",
+        "recommendations": {"saree": {"monsoon": "Georgette"}, "trousers": {"winter": "Wool"}},
+    }, path)
+
+    matrix = FabricMatrix.load(path)
+    assert matrix.get("Sari", "Rainy") == "Georgette"
+    assert matrix.get("  pants ", "WINTER") == "Wool"
+    assert matrix.get("saree", "summer") is None
+    assert len(matrix) == 2
+    assert matrix.stats()["model"] == "test-model"
+
+
+def test_matrix_ignores_other_versions_and_missing_files(tmp_path):
+    path = str(tmp_path / "matrix.json")
+    write_matrix({"version": MATRIX_VERSION + 1, "recommendations": {"saree": {"summer": "x"}}}, path)
+    assert len(FabricMatrix.load(path)) == 0
+    assert len(FabricMatrix.load(str(tmp_path / "missing.json"))) == 0
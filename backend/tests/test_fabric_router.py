@@ -0,0 +1,39 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fabric_matrix import FabricMatrix
+from routers import fabric
+
+
+def make_client(monkeypatch):
+    matrix = FabricMatrix(
+        {"saree": {"summer": "Cotton, linen and chiffon"}},
+        {"version": 1, "model": "matrix-build-model", "generated_at": "2026-01-01T00:00:00Z"},
+    )
+    monkeypatch.setattr(fabric, "fabric_matrix", matrix)
+
+    async def fake_completion(messages, **kwargs):
+        return "Wool blends"
+
+    monkeypatch.setattr(fabric, "chat_completion", fake_completion)
+    app = FastAPI()
+    app.include_router(fabric.router, prefix="/api/fabric")
+    return TestClient(app)
+
+
+def test_matrix_answers_report_the_model_that_built_them(monkeypatch):
+    client = make_client(monkeypatch)
+    body = client.post("/api/fabric/recommend", json={"garment_type": "Sari", "season": "summer"}).json()
+    assert body["recommendations"] == "Cotton, linen and chiffon"
+    assert body["precomputed"] is True
+    assert body["model"] == "matrix-build-model"
+    assert body["generated_at"] == "2026-01-01T00:00:00Z"
+
+
+def test_custom_preferences_go_to_the_llm(monkeypatch):
+    client = make_client(monkeypatch)
+    body = client.post("/api/fabric/recommend", json={
+        "garment_type": "saree", "season": "summer", "preferences": "warm",
+    }).json()
+    assert body["recommendations"] == "Wool blends"
+    assert body["precomputed"] is False
@@ -0,0 +1,44 @@
+import fallback_reasoning
+from fallback_reasoning import (
+    OCCASIONS, REASONING_VERSION, SEASONS, STYLES, FallbackReasoning, write_reasoning,
+)
+
+
+def _reasoning_data(fabrics):
+    size = len(fabrics) * len(STYLES) * len(SEASONS) * len(OCCASIONS)
+    index = [-1] * size
+
+    def position(f, style, season, occasion):
+        return ((f * len(STYLES) + STYLES.index(style)) * len(SEASONS) + SEASONS.index(season)) * len(OCCASIONS) + OCCASIONS.index(occasion)
+
+    index[position(0, "formal", "winter", "wedding")] = 0
+    index[position(0, "modern", "summer", "casual")] = 1
+    return {
+        "version": REASONING_VERSION,
+        "styles": STYLES,
+        "seasons": SEASONS,
+        "occasions": OCCASIONS,
+        "fabrics": fabrics,
+        "texts": ["Rich drape for winter weddings", "Breathable everyday wear"],
+        "index": index,
+    }
+
+
+def test_reasoning_lookup_and_defaults(tmp_path):
+    path = str(tmp_path / "reasoning.json.gz")
+    write_reasoning(_reasoning_data(["Silk", "Cotton"]), path)
+
+    reasoning = FallbackReasoning.load(path)
+    assert reasoning.available
+    assert reasoning.get("Silk", "Formal", "Winter", "Wedding") == "Rich drape for winter weddings"
+    # Unknown style/season/occasion fall back to modern/summer/casual
+    assert reasoning.get("Silk", "cyberpunk", "", "brunch") == "Breathable everyday wear"
+    assert reasoning.get("Cotton", "formal", "winter", "wedding") is None
+    assert reasoning.get("Denim", "formal", "winter", "wedding") is None
+
+
+def test_reasoning_built_for_other_combinations_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "reasoning.json.gz")
+    write_reasoning(_reasoning_data(["Silk"]), path)
+    monkeypatch.setattr(fallback_reasoning, "STYLES", STYLES + ["gothic"])
+    assert not FallbackReasoning.load(path).available
@@ -0,0 +1,46 @@
+from keyword_index import KeywordIndex, tokenize
+
+
+def posts(*captions, platform="instagram", start=0):
+    return [
+        {"platform": platform, "post_id": str(start + i), "caption": caption}
+        for i, caption in enumerate(captions)
+    ]
+
+
+def test_tokenize_drops_links_tags_numbers_and_stopwords():
+    assert tokenize("The LINEN saree #summer @shop https://x.co/a 2024 drape") == ["linen", "saree", "drape"]
+
+
+def test_seen_posts_do_not_inflate_document_frequencies(tmp_path):
+    index = KeywordIndex(str(tmp_path / "keywords.db"))
+    batch = posts("linen saree drape", "linen kurta")
+    first = index.extract(batch)
+    before = dict(index._doc_freq)
+    assert index.stats()["documents"] == 2
+
+    second = index.extract(batch)
+    assert index.stats()["documents"] == 2
+    assert index._doc_freq == before
+    assert second == first
+
+
+def test_new_and_idless_posts(tmp_path):
+    path = str(tmp_path / "keywords.db")
+    index = KeywordIndex(path)
+    index.extract(posts("linen saree"))
+    index.extract(posts("linen shirt", start=1) + [{"platform": "instagram", "caption": "linen dress"}])
+    assert index.stats()["documents"] == 2
+    assert index._doc_freq["linen"] == 2
+    assert "dress" not in index._doc_freq
+
+    # Persisted: a fresh index over the same file sees the same corpus
+    assert KeywordIndex(path).stats() == index.stats()
+
+
+def test_rare_terms_outrank_common_ones(tmp_path):
+    index = KeywordIndex(str(tmp_path / "keywords.db"))
+    index.extract(posts(*["fashion outfit"] * 50, start=100))
+    top = index.extract(posts("fashion outfit chikankari", "fashion chikankari"))
+    assert top[0]["keyword"] == "chikankari"
+    assert {k["keyword"]: k["count"] for k in top}["fashion"] == 2
@@ -0,0 +1,36 @@
+import time
+
+from llm_cache import LLMCache, make_cache_key
+
+
+def test_cache_key_ignores_whitespace_differences():
+    a = make_cache_key("m", [{"role": "user", "content": "red  saree\n ideas"}], 0.7, 100)
+    b = make_cache_key("m", [{"role": "user", "content": "red saree ideas"}], 0.7, 100)
+    c = make_cache_key("m", [{"role": "user", "content": "red saree ideas"}], 0.2, 100)
+    assert a == b
+    assert a != c
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl_seconds=0.05, max_entries=10)
+    cache.set("k", "m", "answer")
+    assert cache.get("k") == "answer"
+    time.sleep(0.08)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=2)
+    cache.set("a", "m", "A")
+    time.sleep(0.01)
+    cache.set("b", "m", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"          # touch "a" so "b" is now the oldest
+    time.sleep(0.01)
+    cache.set("c", "m", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from llm_gateway import LLMGateway
+from llm_resilience import CircuitBreaker, CircuitOpenError
+from llm_routing import MODEL_TIERS
+
+
+class FakeProvider:
+    """Records calls; `delays` maps model -> seconds, `fail` raises on every call"""
+
+    def __init__(self, delays=None, fail=False):
+        self.delays = delays or {}
+        self.fail = fail
+        self.calls = []
+
+    async def complete(self, model, messages, temperature, max_tokens):
+        self.calls.append(model)
+        delay = self.delays.get(model, 0.0)
+        if callable(delay):
+            delay = delay(len(self.calls))
+        await asyncio.sleep(delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"content": f"answer from {model}", "usage": {"total_tokens": 1}}
+
+    async def aclose(self):
+        pass
+
+
+def make_gateway(provider):
+    gateway = LLMGateway({
+        "fake": {"provider": "fake", "api_key": None, "base_url": None, "timeout": 5.0, "max_concurrency": 8},
+    })
+    gateway._providers["fake"] = provider
+    return gateway
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+
+
+def test_identical_concurrent_requests_share_one_upstream_call():
+    provider = FakeProvider(delays={"m": 0.05})
+    gateway = make_gateway(provider)
+    messages = [{"role": "user", "content": "same prompt"}]
+
+    async def run():
+        return await asyncio.gather(*(gateway.chat(messages, model="m", upstream="fake") for _ in range(5)))
+
+    answers = asyncio.run(run())
+    assert answers == ["answer from m"] * 5
+    assert provider.calls == ["m"]
+    assert gateway.coalesced == 4
+
+
+def test_budget_overrun_retries_once_on_the_other_tier():
+    large, fast = MODEL_TIERS["large"], MODEL_TIERS["fast"]
+    provider = FakeProvider(delays={large: 1.0})
+    gateway = make_gateway(provider)
+
+    answer = asyncio.run(gateway.chat(
+        [{"role": "user", "content": "q"}], task="stylist_chat", upstream="fake", timeout=0.05,
+    ))
+    assert answer == f"answer from {fast}"
+    assert provider.calls == [large, fast]
+
+
+def test_breaker_opens_after_threshold_and_lets_one_probe_through():
+    breaker = CircuitBreaker("x", failure_threshold=2, reset_seconds=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_call()                  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()              # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast_without_calling_upstream(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 2)
+    provider = FakeProvider(fail=True)
+    gateway = make_gateway(provider)
+
+    async def call(i):
+        return await gateway.chat([{"role": "user", "content": f"q{i}"}], model="m", upstream="fake")
+
+    for i in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(call(i))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call(3))
+    assert len(provider.calls) == 2
+
+
+def test_slow_attempt_is_hedged_and_backup_wins(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    model = MODEL_TIERS["large"]
+    # First call hangs, the hedged duplicate answers immediately
+    provider = FakeProvider(delays={model: lambda n: 2.0 if n == 1 else 0.0})
+    gateway = make_gateway(provider)
+
+    started = time.perf_counter()
+    answer = asyncio.run(gateway.chat(
+        [{"role": "user", "content": "q"}], task="pricing_strategy", upstream="fake",
+    ))
+    assert answer == f"answer from {model}"
+    assert time.perf_counter() - started < 1.0
+    assert gateway.hedged == 1
+    assert provider.calls == [model, model]
+
+
+def test_task_budget_overruns_do_not_open_the_circuit(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 2)
+    provider = FakeProvider(delays={"m": 1.0})
+    gateway = make_gateway(provider)
+
+    async def call(i, timeout):
+        return await gateway.chat([{"role": "user", "content": f"q{i}"}], model="m", upstream="fake", timeout=timeout)
+
+    # Budgets tighter than the upstream's 5 s timeout are the task's choice, not provider failures
+    for i in range(4):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(call(i, 0.01))
+    assert gateway._get_breaker("fake").state == "closed"
+    assert gateway._get_breaker("fake").consecutive_failures == 0
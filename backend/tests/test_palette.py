@@ -0,0 +1,73 @@
+import asyncio
+
+import cv2
+import numpy as np
+
+from config import settings
+from palette import PixelReservoir, build_palette, image_lab_pixels, palette_shift
+from routers import advanced_trends
+
+RED, BLUE = (220, 30, 30), (30, 60, 200)
+
+
+def encoded_image(rgb_halves, side=32):
+    """PNG bytes with the left/right halves in the given RGB colours"""
+    img = np.zeros((side, side, 3), dtype=np.uint8)
+    img[:, : side // 2] = rgb_halves[0][::-1]     # cv2 wants BGR
+    img[:, side // 2:] = rgb_halves[1][::-1]
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+def test_pooled_palette_shares_and_shift():
+    reservoir = PixelReservoir(capacity=4096)
+    for _ in range(3):
+        reservoir.add(image_lab_pixels(encoded_image((RED, RED))))
+    reservoir.add(image_lab_pixels(encoded_image((BLUE, BLUE))))
+
+    palette = build_palette(reservoir, num_colors=4)
+    assert len(palette) == 2                      # duplicate centers are merged
+    red, blue = palette
+    assert red["rgb"]["r"] > 180 and blue["rgb"]["b"] > 160
+    assert abs(red["share"] - 0.75) < 0.05
+
+    assert palette_shift(palette, palette) == 0.0
+    assert palette_shift([], palette) == 1.0
+    flipped = [dict(red, share=blue["share"]), dict(blue, share=red["share"])]
+    assert abs(palette_shift(palette, flipped) - 0.5) < 0.05
+
+
+def test_reservoir_stays_bounded():
+    reservoir = PixelReservoir(capacity=100)
+    for _ in range(5):
+        reservoir.add(image_lab_pixels(encoded_image((RED, BLUE))))
+    assert len(reservoir.pixels) == 100 and reservoir.images == 5
+
+
+class FakeFetcher:
+    def __init__(self, content):
+        self.content = content
+        self.requested = 0
+
+    async def fetch(self, urls, budget_seconds=None, stats=None):
+        urls = list(urls)
+        self.requested += len(urls)
+        stats.update({"requested": len(urls), "fetched": len(urls), "failed": 0, "timed_out": 0})
+        for url in urls:
+            yield url, self.content
+
+
+def test_adaptive_sampling_stops_once_palette_converges(monkeypatch):
+    monkeypatch.setattr(settings, "PALETTE_ADAPTIVE_BATCH", 4)
+    monkeypatch.setattr(settings, "PALETTE_ADAPTIVE_MIN_BATCHES", 2)
+    monkeypatch.setattr(settings, "PALETTE_ADAPTIVE_TOLERANCE", 0.05)
+    fetcher = FakeFetcher(encoded_image((RED, BLUE)))
+    monkeypatch.setattr(advanced_trends, "image_fetcher", fetcher)
+
+    posts = [{"image_url": f"https://cdn.example/{i}.png", "likes": i} for i in range(40)]
+    sampling = {}
+    palette = asyncio.run(advanced_trends.extract_dominant_colors(posts, adaptive=True, sampling=sampling))
+
+    assert sampling["converged"]
+    assert sampling["images_used"] < sampling["images_available"] == 40
+    assert fetcher.requested == sampling["images_used"]
+    assert len(palette) == 2 and all(color["name"] for color in palette)
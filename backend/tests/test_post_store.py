@@ -0,0 +1,56 @@
+import time
+
+from post_store import PostStore
+
+
+def post(post_id, posted_at=None, **extra):
+    return {"platform": "instagram", "post_id": post_id, "posted_at": posted_at,
+            "hashtags": ["linen"], "caption": "linen saree", **extra}
+
+
+def test_undated_posts_keep_their_first_seen_date(tmp_path):
+    store = PostStore(str(tmp_path / "posts.db"), freshness_seconds=3600)
+    store.upsert([post("1")])
+    first_seen = store._connect().execute("SELECT posted_at FROM posts").fetchone()[0]
+
+    time.sleep(0.02)
+    store.upsert([post("1", likes=10, query_terms=["saree"])])
+    conn = store._connect()
+    assert conn.execute("SELECT posted_at FROM posts").fetchone()[0] == first_seen
+    tags = dict(conn.execute("SELECT tag, posted_at FROM post_tags").fetchall())
+    assert tags == {"linen": first_seen, "saree": first_seen}
+    assert store.query("instagram", ["saree"])[0]["likes"] == 10
+
+
+def test_dated_posts_use_their_own_timestamp(tmp_path):
+    store = PostStore(str(tmp_path / "posts.db"), freshness_seconds=3600)
+    store.upsert([post("1")])
+    store.upsert([post("1", posted_at="2024-05-01T10:00:00Z")])
+    rows = store._connect().execute("SELECT posted_at FROM posts UNION ALL SELECT posted_at FROM post_tags").fetchall()
+    assert {r[0] for r in rows} == {1714557600.0}
+
+
+def test_collect_serves_fresh_terms_from_the_store(tmp_path, monkeypatch):
+    import asyncio
+
+    from routers import advanced_trends
+
+    store = PostStore(str(tmp_path / "posts.db"), freshness_seconds=3600)
+    monkeypatch.setattr(advanced_trends, "post_store", store)
+    monkeypatch.setattr(advanced_trends, "APIFY_AVAILABLE", True)
+    scraped_terms = []
+
+    async def stream_shard(terms, limit, timeout_seconds, newer_than=None):
+        scraped_terms.extend(terms)
+        for term in terms:
+            yield post(f"{term}-1", hashtags=[term], caption=f"{term} look")
+
+    async def collect():
+        budget = advanced_trends.ResultBudget(100)
+        return await advanced_trends.collect_platform_posts("instagram", ["linen", "khadi"], stream_shard, budget)
+
+    first = asyncio.run(collect())
+    second = asyncio.run(collect())
+    assert first["count"] == second["count"] == 2
+    assert sorted(scraped_terms) == ["khadi", "linen"]          # second run scraped nothing
+    assert second["fresh_terms"] == ["linen", "khadi"]
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from routers import advanced_trends
+from routers.advanced_trends import ResultBudget, scrape_sharded
+
+
+def fake_stream(delays, posts=20):
+    """Shard stream yielding `posts` posts, one per `delays[term]` seconds"""
+    async def stream_shard(terms, limit, timeout_seconds, newer_than=None):
+        for n in range(posts):
+            await asyncio.sleep(delays[terms[0]])
+            yield {"post_id": f"{terms[0]}-{n}", "posted_at": None}
+    return stream_shard
+
+
+@pytest.fixture(autouse=True)
+def sharding(monkeypatch):
+    monkeypatch.setattr(advanced_trends, "APIFY_AVAILABLE", True)
+    monkeypatch.setattr(settings, "APIFY_SHARD_SIZE", 1)
+    monkeypatch.setattr(settings, "APIFY_MAX_PARALLEL_SHARDS", 2)
+
+
+def test_slow_shard_times_out_alone_and_keeps_its_posts(monkeypatch):
+    monkeypatch.setattr(settings, "APIFY_SHARD_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "APIFY_PLATFORM_TIMEOUT_SECONDS", 5.0)
+    budget = ResultBudget(1000)
+
+    result = asyncio.run(scrape_sharded("instagram", ["fast", "slow"], fake_stream({"fast": 0.001, "slow": 0.03}), budget))
+    fast, slow = result["shards"]
+    assert fast["success"] and not slow["success"]
+    assert fast["posts"] == 20
+    assert slow["error"].startswith("Timed out") and 0 < slow["posts"] < 20
+    assert result["count"] == fast["posts"] + slow["posts"]
+
+
+def test_platform_timeout_bounds_all_shards(monkeypatch):
+    monkeypatch.setattr(settings, "APIFY_SHARD_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "APIFY_PLATFORM_TIMEOUT_SECONDS", 0.3)
+    terms = [f"t{i}" for i in range(8)]
+
+    started = time.perf_counter()
+    result = asyncio.run(scrape_sharded("pinterest", terms, fake_stream(dict.fromkeys(terms, 0.05)), ResultBudget(10_000)))
+    # 8 shards, 2 at a time, 0.2 s each would take 0.8 s without the platform limit
+    assert time.perf_counter() - started < 0.6
+    assert any("Pinterest timed out" in (s["error"] or "") for s in result["shards"])
+    assert result["count"] > 0
@@ -0,0 +1,46 @@
+from streaming_json import StreamingJSONParser
+
+ANSWER = (
+    'Here you go:\n```json\n'
+    '{"recommendations": [{"name": "Linen {breezy}", "note": "say \\"hi\\""}, {"name": "Khadi"}], '
+    '"summary": "Light fabrics [summer]"}\n```'
+)
+EXPECTED = {
+    "recommendations": [{"name": "Linen {breezy}", "note": 'say "hi"'}, {"name": "Khadi"}],
+    "summary": "Light fabrics [summer]",
+}
+
+
+def test_whole_answer_skips_prose_and_fences():
+    parser = StreamingJSONParser("recommendations")
+    items = parser.feed(ANSWER)
+    assert items == EXPECTED["recommendations"]
+    assert parser.complete
+    assert parser.result() == EXPECTED
+
+
+def test_same_result_for_every_chunk_boundary():
+    for cut in range(1, len(ANSWER)):
+        parser = StreamingJSONParser("recommendations")
+        items = parser.feed(ANSWER[:cut]) + parser.feed(ANSWER[cut:])
+        assert items == EXPECTED["recommendations"], cut
+        assert parser.result() == EXPECTED, cut
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    parser = StreamingJSONParser("recommendations")
+    assert parser.feed('{"recommendations": [{"name": "Linen"}, {"na') == [{"name": "Linen"}]
+    assert parser.feed('me": "Silk"}') == [{"name": "Silk"}]
+
+
+def test_truncated_answer_keeps_completed_parts():
+    parser = StreamingJSONParser("recommendations")
+    parser.feed('{"summary": "ok", "recommendations": [{"name": "Linen"}, {"name": "Si')
+    assert not parser.complete
+    assert parser.result() == {"summary": "ok", "recommendations": [{"name": "Linen"}]}
+
+
+def test_malformed_item_is_dropped_alone():
+    parser = StreamingJSONParser("recommendations")
+    parser.feed('{"recommendations": [{"name": Linen}, {"name": "Silk"}]}')
+    assert parser.items == [{"name": "Silk"}]
@@ -0,0 +1,39 @@
+from style_lexicon import STYLE_LEXICON, StyleMatcher, compile_terms
+
+LEXICON = {
+    "oversized": ["oversized", "loose fit", "loose"],
+    "sustainable": ["eco", "organic"],
+    "vintage": ["retro", "throwback"],
+    "y2k": ["throwback", "early 2000"],
+}
+
+
+def test_terms_must_start_a_word():
+    matcher = StyleMatcher(LEXICON)
+    assert matcher.terms_in("Bioorganic prints, a geco motif") == set()
+    assert matcher.terms_in("eco-friendly, organic cotton") == {"eco", "organic"}
+
+
+def test_terms_match_inflected_and_hashtag_forms():
+    matcher = StyleMatcher(STYLE_LEXICON)
+    assert matcher.terms_in("Minimalist outfit") == {"minimal"}
+    assert matcher.terms_in("#streetwear drop, new sneakers") == {"street", "sneaker"}
+    assert matcher.terms_in("#VintageFashion") == {"vintage"}
+    assert matcher.count_styles(["minimalist streetwear vibes"] * 3)["streetwear"] == 3
+
+
+def test_longest_term_wins_and_whitespace_runs_match():
+    matcher = StyleMatcher(LEXICON)
+    assert matcher.terms_in("Loose\n   fitted jeans") == {"loose fit"}
+    assert matcher.terms_in("loose jeans") == {"loose"}
+    assert compile_terms(["re", "retro"]).findall("retro") == ["retro"]
+
+
+def test_styles_count_distinct_terms_per_post():
+    matcher = StyleMatcher(LEXICON)
+    scores = matcher.count_styles([
+        "retro retro RETRO",
+        "throwback to the early  2000 era",
+        "nothing here",
+    ])
+    assert scores == {"oversized": 0, "sustainable": 0, "vintage": 2, "y2k": 2}
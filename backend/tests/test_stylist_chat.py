@@ -0,0 +1,67 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from routers import stylist
+from semantic_cache import SemanticCache
+
+GREETING = {"user": "", "assistant": "Hello, I'm your VastraVaani AI Stylist"}
+
+
+def make_client(monkeypatch):
+    calls = []
+
+    async def fake_completion(messages, details=None, **kwargs):
+        calls.append(messages)
+        details["model"] = "fast-model"
+        return "Pair it with white sneakers."
+
+    monkeypatch.setattr(stylist, "chat_completion", fake_completion)
+    monkeypatch.setattr(settings, "STYLIST_SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(stylist, "stylist_answer_cache", SemanticCache(
+        threshold=0.9, max_entries=100, ttl_seconds=3600, n_features=2 ** 16,
+    ))
+    app = FastAPI()
+    app.include_router(stylist.router, prefix="/api/stylist")
+    return TestClient(app), calls
+
+
+def test_opening_question_from_web_client_uses_semantic_cache(monkeypatch):
+    client, calls = make_client(monkeypatch)
+    # The shape Stylist.jsx sends for a first message: just the greeting as history
+    body = {"message": "How do I style a denim jacket?", "session_id": None, "history": [GREETING]}
+
+    first = client.post("/api/stylist/chat", json=body).json()
+    second = client.post("/api/stylist/chat", json=body).json()
+
+    assert first["cached"] is False and second["cached"] is True
+    assert first["model"] == second["model"] == "fast-model"
+    assert len(calls) == 1
+    assert all(m["content"] != GREETING["assistant"] for m in calls[0])
+
+
+def test_follow_up_questions_skip_semantic_cache(monkeypatch):
+    client, calls = make_client(monkeypatch)
+    history = [
+        GREETING,
+        {"user": "How do I style a denim jacket?", "assistant": ""},
+        {"user": "", "assistant": "Pair it with white sneakers."},
+    ]
+    body = {"message": "What about in winter?", "history": history}
+    client.post("/api/stylist/chat", json=body)
+    assert client.post("/api/stylist/chat", json=body).json()["cached"] is False
+    assert len(calls) == 2
+
+
+def test_stream_done_event_reports_the_answering_model(monkeypatch):
+    client, _ = make_client(monkeypatch)
+
+    async def fake_stream(messages, **kwargs):
+        yield {"delta": "Try "}
+        yield {"delta": "linen."}
+        yield {"done": True, "usage": None, "model": "fast-model", "cached": False}
+
+    monkeypatch.setattr(stylist, "stream_chat_completion", fake_stream)
+    body = client.post("/api/stylist/chat/stream", json={"message": "Summer fabric?", "history": [GREETING]}).text
+    done = body.split("event: done\ndata: ")[1]
+    assert '"model": "fast-model"' in done
@@ -0,0 +1,85 @@
+import asyncio
+
+from routers import stylist_sessions
+from routers.stylist_sessions import MAX_PENDING_TURNS, RECENT_TURNS, SessionStore
+
+
+def test_requests_without_session_id_are_not_stored():
+    store = SessionStore()
+    history = [{"user": f"q{i}", "assistant": f"a{i}"} for i in range(6)]
+    session = store.get_or_create(None, history)
+
+    assert not session.stored
+    assert len(session.recent) == RECENT_TURNS
+    assert store.get(session.session_id) is None
+    # Overflowing the recent window must not start a summary for a throwaway session
+    store.record_turn(session, "new question", "answer")
+    assert session.pending and not session.summarizing and not store._tasks
+
+
+def test_returned_session_id_starts_a_stored_session():
+    store = SessionStore()
+    session_id = store.get_or_create(None, []).session_id
+    session = store.get_or_create(session_id, [{"user": "hi", "assistant": "hello"}])
+    assert session.stored and store.get(session_id) is session
+    assert store.get_or_create(session_id, []) is session
+
+
+def test_one_summarizer_per_session(monkeypatch):
+    calls = []
+
+    async def fake_completion(messages, **kwargs):
+        calls.append(messages[0]["content"])
+        await asyncio.sleep(0.01)
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(stylist_sessions, "chat_completion", fake_completion)
+
+    async def run():
+        store = SessionStore()
+        session = store.get_or_create("s1")
+        for i in range(RECENT_TURNS + 3):
+            store.record_turn(session, f"q{i}", f"a{i}")
+        assert len(store._tasks) == 1
+        await asyncio.gather(*store._tasks)
+        return session
+
+    session = asyncio.run(run())
+    assert len(calls) == 1                       # all three overflow turns in one batch
+    assert session.pending == [] and session.summary == "summary 1"
+    assert not session.summarizing
+
+
+def test_pending_turns_are_capped_when_summaries_fail(monkeypatch):
+    async def failing_completion(messages, **kwargs):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(stylist_sessions, "chat_completion", failing_completion)
+
+    async def run():
+        store = SessionStore()
+        session = store.get_or_create("s1")
+        for i in range(RECENT_TURNS + MAX_PENDING_TURNS + 10):
+            store.record_turn(session, f"q{i}", f"a{i}")
+            await asyncio.sleep(0)
+        await asyncio.gather(*store._tasks)
+        return session
+
+    session = asyncio.run(run())
+    assert len(session.pending) == MAX_PENDING_TURNS
+    assert session.pending[-1]["user"] == f"q{MAX_PENDING_TURNS + 9}"
+
+
+def test_web_client_history_is_paired_and_greeting_dropped():
+    history = [
+        {"user": "", "assistant": "Hello, I'm your stylist"},
+        {"user": "What goes with navy?", "assistant": ""},
+        {"user": "", "assistant": "Try camel or white."},
+        {"user": "And for shoes?", "assistant": ""},
+    ]
+    session = SessionStore().get_or_create(None, history)
+    assert session.recent == [
+        {"user": "What goes with navy?", "assistant": "Try camel or white."},
+        {"user": "And for shoes?", "assistant": ""},
+    ]
+    assert SessionStore().get_or_create(None, history[:1]).has_context is False
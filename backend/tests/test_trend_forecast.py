@@ -0,0 +1,29 @@
+import numpy as np
+
+from trend_forecast import holt_forecast
+
+
+def test_linear_series_recovers_slope_and_extends_it():
+    values = 10 + 2.0 * np.arange(30)
+    fit = holt_forecast(values, horizon=3)
+    assert abs(fit["trend"][0] - 2.0) < 0.1
+    assert np.allclose(fit["forecast"][0], [70, 72, 74], atol=1.0)
+    assert fit["growth_rate"][0] > 0
+
+
+def test_series_are_fitted_independently_with_gaps():
+    flat = np.full(20, 5.0)
+    falling = 100 - 3.0 * np.arange(20)
+    falling[[4, 9, 10]] = np.nan
+    fit = holt_forecast(np.vstack([flat, falling]), horizon=2)
+
+    assert abs(fit["trend"][0]) < 1e-9 and abs(fit["level"][0] - 5.0) < 1e-9
+    assert fit["trend"][1] < -2.5
+    assert list(fit["observations"]) == [20, 17]
+
+
+def test_forecast_is_floored_at_zero_and_empty_rows_stay_zero():
+    values = np.vstack([np.array([9.0, 6.0, 3.0, 0.5]), np.full(4, np.nan)])
+    fit = holt_forecast(values, horizon=5)
+    assert (fit["forecast"] >= 0).all()
+    assert fit["level"][1] == 0 and fit["observations"][1] == 0
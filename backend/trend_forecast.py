@@ -0,0 +1,145 @@
+"""
+Numeric trend forecasts for rollup series.
+
+Holt's linear exponential smoothing (level + trend) is fitted to all of a
+theme's series at once. The series are rows of one (n_series, n_days)
+array and the smoothing recursion steps over days, vectorized across
+series and across a small grid of (alpha, beta) pairs. Each series keeps
+the pair with the lowest one-step-ahead squared error. Missing days (NaN)
+carry the previous level and trend forward.
+
+Per series this gives:
+- growth_rate: smoothed trend relative to the current level, per day
+- acceleration: change in the smoothed trend per day over the last week
+- forecast: level + h * trend for the next `horizon` days, floored at 0
+
+Benchmark: python trend_forecast.py --series 10000 --days 90
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from trend_history import day_number, trend_history
+
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+BETAS = (0.05, 0.15, 0.3)
+ACCELERATION_WINDOW = 7
+
+
+def holt_forecast(
+    values: np.ndarray,
+    horizon: int = 7,
+    alphas: Sequence[float] = ALPHAS,
+    betas: Sequence[float] = BETAS,
+    acceleration_window: int = ACCELERATION_WINDOW,
+) -> Dict[str, np.ndarray]:
+    """Fit every row of `values` (n_series, n_days) and forecast `horizon` days ahead"""
+    y = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_series, n_days = y.shape
+
+    grid_alpha, grid_beta = np.meshgrid(alphas, betas, indexing="ij")
+    alpha = grid_alpha.reshape(-1, 1)              # (grid, 1), broadcast across series
+    alpha_beta = alpha * grid_beta.reshape(-1, 1)
+    shape = (alpha.shape[0], n_series)
+
+    level = np.zeros(shape)
+    trend = np.zeros(shape)
+    sse = np.zeros(shape)
+    started = np.zeros(n_series, dtype=bool)
+    # Ring buffer of recent trends for the acceleration estimate
+    window = max(0, min(acceleration_window, n_days - 1))
+    recent_trends = np.zeros((window + 1,) + shape)
+
+    for day in range(n_days):
+        observed = y[:, day]
+        seen = ~np.isnan(observed)
+
+        # Error-correction form: l = l + b + a*e, b = b + a*b*e; unseen days just extrapolate
+        prediction = level + trend
+        error = np.where(seen & started, observed - prediction, 0.0)
+        sse += error * error
+        level = prediction + alpha * error
+        trend += alpha_beta * error
+
+        # A series' first observation initialises its level with a flat trend
+        first = seen & ~started
+        if first.any():
+            level[:, first] = observed[first]
+            trend[:, first] = 0.0
+            started |= first
+
+        recent_trends[day % (window + 1)] = trend
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(n_series)
+    level = level[best, cols]
+    trend = trend[best, cols]
+    if window:
+        oldest = recent_trends[n_days % (window + 1)][best, cols]
+        acceleration = (trend - oldest) / window
+    else:
+        acceleration = np.zeros(n_series)
+
+    scale = np.abs(level)
+    growth_rate = np.divide(trend, scale, out=np.zeros(n_series), where=scale > 1e-9)
+    steps = np.arange(1, horizon + 1)
+    forecast = np.maximum(level[:, None] + trend[:, None] * steps, 0.0)
+
+    return {
+        "level": level,
+        "trend": trend,
+        "growth_rate": growth_rate,
+        "acceleration": acceleration,
+        "forecast": forecast,
+        "alpha": grid_alpha.reshape(-1)[best],
+        "beta": grid_beta.reshape(-1)[best],
+        "observations": (~np.isnan(y)).sum(axis=1),
+    }
+
+
+def forecast_theme(theme: str, metric: str, days: int = 90, horizon: int = 7, limit: int = 20) -> List[Dict]:
+    """Forecast every stored series of a theme's metric, fastest growing first"""
+    end_day = day_number()
+    keys, values = trend_history.matrix(theme, metric, end_day - max(days, 1) + 1, end_day)
+    if not keys:
+        return []
+
+    fit = holt_forecast(values, horizon=horizon)
+    order = np.argsort(-fit["growth_rate"], kind="stable")
+    return [
+        {
+            "key": keys[i],
+            "level": round(float(fit["level"][i]), 4),
+            "growth_rate": round(float(fit["growth_rate"][i]), 4),
+            "acceleration": round(float(fit["acceleration"][i]), 4),
+            "forecast": [round(float(v), 4) for v in fit["forecast"][i]],
+            "observations": int(fit["observations"][i]),
+        }
+        for i in order[:limit]
+        if fit["observations"][i] > 0
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark vectorized Holt forecasting")
+    parser.add_argument("--series", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--horizon", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    slopes = rng.normal(0.0, 0.5, size=(args.series, 1))
+    data = 50 + slopes * np.arange(args.days) + rng.normal(0, 3, size=(args.series, args.days))
+    data[rng.random(data.shape) < 0.2] = np.nan     # days a tag fell out of the rollup
+
+    started = time.perf_counter()
+    fit = holt_forecast(data, horizon=args.horizon)
+    elapsed = time.perf_counter() - started
+
+    corr = np.corrcoef(slopes[:, 0], fit["trend"])[0, 1]
+    print(f"Fitted {args.series} series x {args.days} days in {elapsed * 1000:.1f} ms "
+          f"({len(ALPHAS) * len(BETAS)} parameter pairs each); trend vs true slope r={corr:.3f}")
@@ -0,0 +1,180 @@
+"""
+Daily rollups of trend analyses, per theme.
+
+Each /analyze-advanced run is reduced to a handful of numbers per day:
+hashtag and keyword counts, style scores from analyze_popular_styles and
+palette shares from extract_dominant_colors. They are stored in SQLite as
+one narrow (theme, metric, key, day) -> value table clustered on that
+primary key (WITHOUT ROWID), so every series is a contiguous run of rows:
+
+- appending a day is a single-row upsert per value
+- a date-range query for a series is one index range scan
+- later runs on the same day replace that day's values
+
+Days are stored as integer UTC day numbers and returned as ISO dates.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+
+METRICS = ("posts", "hashtag", "keyword", "style", "color")
+
+_EPOCH = date(1970, 1, 1)
+
+
+def day_number(value: Optional[date] = None) -> int:
+    """UTC day number for a date (today if omitted)"""
+    if value is None:
+        return int(time.time() // 86400)
+    return (value - _EPOCH).days
+
+
+def day_iso(day: int) -> str:
+    return (_EPOCH + timedelta(days=day)).isoformat()
+
+
+def normalize_theme(theme: str) -> str:
+    return " ".join(theme.lower().split())
+
+
+def rollup_values(analysis: Dict) -> Dict[str, Dict[str, float]]:
+    """metric -> {key: value} for one analysis run"""
+    hashtags = analysis.get("hashtags", {})
+    colors = analysis.get("dominant_colors", [])
+    color_total = sum(c["count"] for c in colors) or 1
+    return {
+        "posts": {"total": float(hashtags.get("total_posts", 0))},
+        "hashtag": {h["tag"].lstrip("#").lower(): float(h["count"]) for h in hashtags.get("top_hashtags", [])},
+        "keyword": {k["keyword"]: float(k["count"]) for k in hashtags.get("top_keywords", [])},
+        "style": {s["style"].lower(): float(s["score"]) for s in analysis.get("popular_styles", [])},
+        "color": {c["hex"].lower(): round(c["count"] / color_total, 4) for c in colors},
+    }
+
+
+class TrendHistory:
+    """SQLite-backed per-theme daily rollup store"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollups (
+                    theme TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    day INTEGER NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (theme, metric, key, day)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def record(self, theme: str, analysis: Dict, day: Optional[int] = None) -> int:
+        """Store one run's rollup for `day` (today by default); returns values written.
+
+        A metric's values for the day are replaced as a whole, so keys that
+        dropped out of a later run's top list don't linger.
+        """
+        theme = normalize_theme(theme)
+        day = day_number() if day is None else day
+        values = rollup_values(analysis)
+        rows = [
+            (theme, metric, key, day, value)
+            for metric, series in values.items()
+            for key, value in series.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "DELETE FROM rollups WHERE theme = ? AND metric = ? AND day = ?",
+                [(theme, metric, day) for metric in values],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO rollups (theme, metric, key, day, value) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+        return len(rows)
+
+    def top_keys(self, theme: str, metric: str, start_day: int, end_day: int, limit: int = 10) -> List[str]:
+        """Keys with the largest total over the range"""
+        with self._lock:
+            rows = self._connect().execute(
+                """SELECT key FROM rollups
+                   WHERE theme = ? AND metric = ? AND day BETWEEN ? AND ?
+                   GROUP BY key ORDER BY SUM(value) DESC LIMIT ?""",
+                (normalize_theme(theme), metric, start_day, end_day, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def series(self, theme: str, metric: str, keys: Iterable[str], start_day: int, end_day: int) -> Dict[str, Dict]:
+        """key -> {"days": [...], "values": [...]} over [start_day, end_day], days ascending"""
+        theme = normalize_theme(theme)
+        result = {}
+        with self._lock:
+            conn = self._connect()
+            for key in keys:
+                rows = conn.execute(
+                    """SELECT day, value FROM rollups
+                       WHERE theme = ? AND metric = ? AND key = ? AND day BETWEEN ? AND ?
+                       ORDER BY day""",
+                    (theme, metric, key, start_day, end_day),
+                ).fetchall()
+                result[key] = {
+                    "days": [day_iso(day) for day, _ in rows],
+                    "values": [value for _, value in rows],
+                }
+        return result
+
+    def matrix(self, theme: str, metric: str, start_day: int, end_day: int) -> Tuple[List[str], np.ndarray]:
+        """Every key of a metric as rows of a (n_keys, n_days) array; NaN where a day has no value"""
+        with self._lock:
+            rows = self._connect().execute(
+                """SELECT key, day, value FROM rollups
+                   WHERE theme = ? AND metric = ? AND day BETWEEN ? AND ?""",
+                (normalize_theme(theme), metric, start_day, end_day),
+            ).fetchall()
+        keys = sorted({key for key, _, _ in rows})
+        values = np.full((len(keys), end_day - start_day + 1), np.nan)
+        if rows:
+            index = {key: i for i, key in enumerate(keys)}
+            key_idx, days, vals = zip(*rows)
+            values[[index[k] for k in key_idx], np.asarray(days) - start_day] = vals
+        return keys, values
+
+    def themes(self) -> List[str]:
+        with self._lock:
+            rows = self._connect().execute("SELECT DISTINCT theme FROM rollups ORDER BY theme").fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            conn = self._connect()
+            rows, themes, first, last = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT theme), MIN(day), MAX(day) FROM rollups"
+            ).fetchone()
+        return {
+            "values": rows,
+            "themes": themes,
+            "first_day": day_iso(first) if first is not None else None,
+            "last_day": day_iso(last) if last is not None else None,
+        }
+
+
+trend_history = TrendHistory(path=settings.TREND_HISTORY_PATH)
@@ -9,6 +9,7 @@ export default function Stylist() {
   ]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const [sessionId, setSessionId] = useState(null);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -28,16 +29,20 @@ export default function Stylist() {
     setLoading(true);
 
     try {
-      const history = messages.map((msg) => ({
-        user: msg.type === "user" ? msg.text : "",
-        assistant: msg.type === "ai" ? msg.text : "",
-      }));
+      const payload = { message: userMessage };
+      if (sessionId) {
+        // The server keeps the conversation; only the new message is sent
+        payload.session_id = sessionId;
+      } else {
+        payload.history = messages.map((msg) => ({
+          user: msg.type === "user" ? msg.text : "",
+          assistant: msg.type === "ai" ? msg.text : "",
+        }));
+      }
 
-      const res = await axios.post(`${API_URL}/stylist/chat`, {
-        message: userMessage,
-        history,
-      });
+      const res = await axios.post(`${API_URL}/stylist/chat`, payload);
 
+      if (res.data.session_id) setSessionId(res.data.session_id);
       setMessages((prev) => [...prev, { type: "ai", text: res.data.response }]);
     } catch (error) {
       setMessages((prev) => [...prev, { type: "ai", text: "⚠️ Sorry, something went wrong. Try again soon." }]);